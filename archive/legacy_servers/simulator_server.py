@@ -5,10 +5,16 @@ Serves static frame images for the ESP32 display simulator
 """
 
 import os
-from flask import Flask, send_file, abort
-from PIL import Image, ImageDraw, ImageFont
+from flask import Flask, Response, request, send_file, abort, make_response
+from PIL import Image, ImageChops, ImageDraw, ImageFont
 import io
-import colorsys
+import functools
+import hashlib
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to upscaling a tiny PIL image
+    np = None
 
 app = Flask(__name__)
 
@@ -24,6 +30,18 @@ COLORS = {
     'black': (0, 0, 0),
 }
 
+# RGB for each whole degree of hue at full saturation/value, converted by PIL
+# in one pass (PIL's HSV hue channel runs 0-255)
+_hue_image = Image.new('HSV', (360, 1))
+_hue_image.putdata([(round(h * 255 / 360) % 256, 255, 255) for h in range(360)])
+HUE_LUT = _hue_image.convert('RGB').load()
+
+# Loading the bundled font parses it from disk, so do it once for all frames
+try:
+    _DEFAULT_FONT = ImageFont.load_default()
+except Exception:
+    _DEFAULT_FONT = None
+
 def create_color_frame(color_name, width=320, height=240):
     """Create a solid color frame"""
     color = COLORS.get(color_name, COLORS['white'])
@@ -35,11 +53,7 @@ def create_startup_frame(width=320, height=240):
     img = Image.new('RGB', (width, height), (0, 0, 0))
     draw = ImageDraw.Draw(img)
     
-    try:
-        # Try to use a larger font if available
-        font = ImageFont.load_default()
-    except:
-        font = None
+    font = _DEFAULT_FONT
     
     # Draw tricorder startup text
     text = "TRICORDER\nSTARTUP"
@@ -56,27 +70,33 @@ def create_startup_frame(width=320, height=240):
     
     return img
 
+@functools.lru_cache(maxsize=4)
+def checkerboard_background(width, height, grid_size=20):
+    """Build the static test checkerboard in one bulk fill instead of per-cell draws"""
+    cols = -(-width // grid_size)
+    rows = -(-height // grid_size)
+    
+    if np is not None:
+        odd = (np.add.outer(np.arange(rows), np.arange(cols)) & 1)[:, :, None]
+        cells = np.where(odd, np.uint8([64, 64, 64]), np.uint8([128, 128, 128]))
+        # Plain repeats upscale without kron's per-element multiply
+        big = cells.repeat(grid_size, axis=0).repeat(grid_size, axis=1)
+        return Image.fromarray(np.ascontiguousarray(big[:height, :width]), 'RGB')
+    
+    cells = Image.new('RGB', (cols, rows))
+    cells.putdata([(64, 64, 64) if (x + y) & 1 else (128, 128, 128)
+                   for y in range(rows) for x in range(cols)])
+    big = cells.resize((cols * grid_size, rows * grid_size), Image.NEAREST)
+    return big.crop((0, 0, width, height))
+
 def create_static_test_frame(width=320, height=240):
     """Create a test pattern frame"""
-    img = Image.new('RGB', (width, height), (0, 0, 0))
+    # Copy the cached grid pattern so the text below doesn't land on it
+    img = checkerboard_background(width, height).copy()
     draw = ImageDraw.Draw(img)
     
-    # Draw a grid pattern
-    grid_size = 20
-    for x in range(0, width, grid_size):
-        for y in range(0, height, grid_size):
-            # Checkerboard pattern
-            if (x // grid_size + y // grid_size) % 2 == 0:
-                color = (128, 128, 128)
-            else:
-                color = (64, 64, 64)
-            draw.rectangle([x, y, x + grid_size, y + grid_size], fill=color)
-    
     # Add text
-    try:
-        font = ImageFont.load_default()
-    except:
-        font = None
+    font = _DEFAULT_FONT
     
     text = "TEST PATTERN"
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -88,39 +108,50 @@ def create_static_test_frame(width=320, height=240):
     
     return img
 
-def create_animated_test_frame(frame_num, total_frames=30, width=320, height=240):
-    """Create an animated test frame"""
-    img = Image.new('RGB', (width, height), (0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Create a rotating color wheel
+NUM_SECTORS = 8
+
+@functools.lru_cache(maxsize=4)
+def color_wheel_sectors(width, height):
+    """Palette image mapping each pixel to its color wheel sector
+
+    The sector shapes are the same in every animated frame; only their colors
+    rotate. Pixels outside the wheel use index NUM_SECTORS (black).
+    """
+    sectors = Image.new('P', (width, height), NUM_SECTORS)
+    draw = ImageDraw.Draw(sectors)
     center_x, center_y = width // 2, height // 2
     radius = min(width, height) // 3
-    
+    for i in range(NUM_SECTORS):
+        start_angle = i * 360 / NUM_SECTORS
+        end_angle = (i + 1) * 360 / NUM_SECTORS
+        draw.pieslice([center_x - radius, center_y - radius,
+                      center_x + radius, center_y + radius],
+                     start_angle, end_angle, fill=i)
+    return sectors
+
+@functools.lru_cache(maxsize=None)
+def sector_palette(frame_num, total_frames=30):
+    """Flat RGB palette for the wheel's sectors at one step of the rotation"""
     # Calculate rotation angle
     angle_offset = (frame_num / total_frames) * 360
     
-    # Draw colored sectors
-    num_sectors = 8
-    for i in range(num_sectors):
-        angle = (i * 360 / num_sectors + angle_offset) % 360
-        hue = angle / 360
-        rgb = colorsys.hsv_to_rgb(hue, 1.0, 1.0)
-        color = tuple(int(c * 255) for c in rgb)
-        
-        # Draw sector
-        start_angle = i * 360 / num_sectors
-        end_angle = (i + 1) * 360 / num_sectors
-        
-        draw.pieslice([center_x - radius, center_y - radius, 
-                      center_x + radius, center_y + radius], 
-                     start_angle, end_angle, fill=color)
+    palette = []
+    for i in range(NUM_SECTORS):
+        angle = (i * 360 / NUM_SECTORS + angle_offset) % 360
+        palette.extend(HUE_LUT[int(angle), 0])
+    palette.extend((0, 0, 0))
+    return bytes(palette)
+
+def create_animated_test_frame(frame_num, total_frames=30, width=320, height=240):
+    """Create an animated test frame"""
+    # Color the cached sector map through this frame's palette
+    frame = color_wheel_sectors(width, height).copy()
+    frame.putpalette(sector_palette(frame_num % total_frames, total_frames))
+    img = frame.convert('RGB')
+    draw = ImageDraw.Draw(img)
     
     # Add frame number
-    try:
-        font = ImageFont.load_default()
-    except:
-        font = None
+    font = _DEFAULT_FONT
     
     text = f"Frame {frame_num:03d}"
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -132,66 +163,162 @@ def create_animated_test_frame(frame_num, total_frames=30, width=320, height=240
     
     return img
 
+def _encode_jpeg(img):
+    """Encode a frame as JPEG bytes"""
+    img_io = io.BytesIO()
+    img.save(img_io, 'JPEG', quality=85)
+    return img_io.getvalue()
+
+# 70% brightness for every channel value, applied by Image.point at C speed
+_DIM_LUT = [int(i * 0.7) for i in range(256)] * 3
+
+# Solid colors are a closed set, so encode each one once at startup
+COLOR_FRAMES = {name: _encode_jpeg(create_color_frame(name)) for name in COLORS}
+
+def render_frame(filename):
+    """Render the frame named by filename; every frame is a pure function of its name"""
+    width, height = 320, 240
+    
+    if filename.startswith('color_'):
+        # Extract color name
+        color_name = filename.replace('color_', '').replace('.jpg', '')
+        img = create_color_frame(color_name, width, height)
+        
+    elif filename == 'startup.jpg':
+        img = create_startup_frame(width, height)
+        
+    elif filename == 'startup_mid.jpg':
+        img = create_startup_frame(width, height)
+        # Make it slightly different (dimmer)
+        img = img.point(_DIM_LUT)
+        
+    elif filename == 'static_test.jpg':
+        img = create_static_test_frame(width, height)
+        
+    elif filename.startswith('animated_test_frame_'):
+        # Extract frame number
+        frame_str = filename.replace('animated_test_frame_', '').replace('.jpg', '')
+        frame_num = int(frame_str)
+        img = create_animated_test_frame(frame_num, 30, width, height)
+        
+    elif filename in ['animated_test.jpg', 'animated_mid.jpg']:
+        # Default animated frame
+        img = create_animated_test_frame(1, 30, width, height)
+        
+    else:
+        # Default frame
+        img = Image.new('RGB', (width, height), (32, 32, 32))
+        draw = ImageDraw.Draw(img)
+        
+        font = _DEFAULT_FONT
+        
+        text = f"Missing:\n{filename}"
+        bbox = draw.textbbox((0, 0), text, font=font)
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+        x = (width - text_width) // 2
+        y = (height - text_height) // 2
+        
+        draw.text((x, y), text, fill=(255, 128, 128), font=font, align='center')
+    
+    return img
+
+@functools.lru_cache(maxsize=64)
+def _build_frame_bytes(filename):
+    """JPEG bytes for a frame, cached by filename"""
+    if filename.startswith('color_'):
+        color_name = filename.replace('color_', '').replace('.jpg', '')
+        return COLOR_FRAMES.get(color_name, COLOR_FRAMES['white'])
+    return _encode_jpeg(render_frame(filename))
+
+def _pack_rgb565(img):
+    """Pack an RGB image into little-endian RGB565, the ST7789's native pixel format"""
+    if np is not None:
+        rgb = np.asarray(img, dtype=np.uint16)
+        packed = ((rgb[..., 0] >> 3) << 11) | ((rgb[..., 1] >> 2) << 5) | (rgb[..., 2] >> 3)
+        return packed.astype('<u2').tobytes()
+    
+    # Build the low and high byte planes with per-band lookup tables; the
+    # OR'd bit fields never overlap, so a clipped add is an exact OR
+    r, g, b = img.split()
+    high = ImageChops.add(r.point([v & 0xF8 for v in range(256)]),
+                          g.point([v >> 5 for v in range(256)]))
+    low = ImageChops.add(g.point([(v << 3) & 0xE0 for v in range(256)]),
+                         b.point([v >> 3 for v in range(256)]))
+    return Image.merge('LA', (low, high)).tobytes()
+
+@functools.lru_cache(maxsize=64)
+def _build_frame_rgb565(filename):
+    """Raw RGB565 bytes for a frame, cached by filename"""
+    return _pack_rgb565(render_frame(filename))
+
+# The simulator cycles through these 30 frames at ~15 FPS, so render each once
+# and encode it up front in both served formats
+ANIMATED_FRAMES = {}
+ANIMATED_FRAMES_RGB565 = {}
+for _i in range(1, 31):
+    _name = f'animated_test_frame_{_i:03d}.jpg'
+    _img = create_animated_test_frame(_i, 30)
+    ANIMATED_FRAMES[_name] = _encode_jpeg(_img)
+    ANIMATED_FRAMES_RGB565[_name] = _pack_rgb565(_img)
+del _i, _name, _img
+
+# The remaining named frames are static too; warm both caches at import so no
+# simulator request pays for a render
+STATIC_FRAMES = ('startup.jpg', 'startup_mid.jpg', 'static_test.jpg',
+                 'animated_test.jpg', 'animated_mid.jpg')
+for _name in STATIC_FRAMES + tuple(f'color_{color}.jpg' for color in COLORS):
+    _build_frame_bytes(_name)
+    _build_frame_rgb565(_name)
+del _name
+
+# Bump whenever the frame renderers change, so browsers drop their old copies
+FRAME_RENDER_VERSION = 1
+
+def _frame_etag(kind, filename):
+    """ETag for a frame; content is a pure function of renderer version and filename"""
+    key = f"{FRAME_RENDER_VERSION}:{kind}:{filename}"
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+def _frame_response(etag, build, mimetype):
+    """Answer revalidations with 304 before building the frame body"""
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = make_response(send_file(io.BytesIO(build()), mimetype=mimetype))
+    response.set_etag(etag)
+    # An hour, not forever: a name that renders as the "Missing" placeholder
+    # today may be backed by a real frame later, and revalidation is a cheap 304
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    return response
+
 @app.route('/api/simulator/frames/<filename>')
 def serve_frame(filename):
     """Serve a frame image for the simulator"""
     try:
-        width, height = 320, 240
+        def build():
+            frame = ANIMATED_FRAMES.get(filename)
+            return frame if frame is not None else _build_frame_bytes(filename)
         
-        if filename.startswith('color_'):
-            # Extract color name
-            color_name = filename.replace('color_', '').replace('.jpg', '')
-            img = create_color_frame(color_name, width, height)
-            
-        elif filename == 'startup.jpg':
-            img = create_startup_frame(width, height)
-            
-        elif filename == 'startup_mid.jpg':
-            img = create_startup_frame(width, height)
-            # Make it slightly different (dimmer)
-            img = Image.eval(img, lambda x: int(x * 0.7))
-            
-        elif filename == 'static_test.jpg':
-            img = create_static_test_frame(width, height)
-            
-        elif filename.startswith('animated_test_frame_'):
-            # Extract frame number
-            frame_str = filename.replace('animated_test_frame_', '').replace('.jpg', '')
-            frame_num = int(frame_str)
-            img = create_animated_test_frame(frame_num, 30, width, height)
-            
-        elif filename in ['animated_test.jpg', 'animated_mid.jpg']:
-            # Default animated frame
-            img = create_animated_test_frame(1, 30, width, height)
-            
-        else:
-            # Default frame
-            img = Image.new('RGB', (width, height), (32, 32, 32))
-            draw = ImageDraw.Draw(img)
-            
-            try:
-                font = ImageFont.load_default()
-            except:
-                font = None
-            
-            text = f"Missing:\n{filename}"
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-            x = (width - text_width) // 2
-            y = (height - text_height) // 2
-            
-            draw.text((x, y), text, fill=(255, 128, 128), font=font, align='center')
+        return _frame_response(_frame_etag('jpeg', filename), build, 'image/jpeg')
         
-        # Convert to JPEG
-        img_io = io.BytesIO()
-        img.save(img_io, 'JPEG', quality=85)
-        img_io.seek(0)
+    except Exception as e:
+        print(f"Error serving frame {filename}: {e}")
+        abort(404)
+
+@app.route('/api/simulator/frames_raw/<filename>')
+def serve_frame_raw(filename):
+    """Serve a frame as raw 320x240 RGB565 so the browser can skip JPEG decoding"""
+    try:
+        def build():
+            frame = ANIMATED_FRAMES_RGB565.get(filename)
+            return frame if frame is not None else _build_frame_rgb565(filename)
         
-        return send_file(img_io, mimetype='image/jpeg')
+        return _frame_response(_frame_etag('rgb565', filename), build,
+                               'application/octet-stream')
         
     except Exception as e:
-        print(f"Error serving frame {filename}: {e}")
+        print(f"Error serving raw frame {filename}: {e}")
         abort(404)
 
 @app.route('/api/simulator/status')
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Shared UDP helpers for the device test scripts
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import functools
+import json
+import os
+import selectors
+import socket
+import struct
+import sys
+import time
+
+try:
+    import orjson
+    dumps = orjson.dumps  # Already returns bytes
+    loads = orjson.loads  # Takes bytes directly, no decode step
+except ImportError:  # orjson is optional; fall back to the stdlib
+    def dumps(obj):
+        """Serialize obj to UTF-8 JSON bytes"""
+        return json.dumps(obj).encode()
+
+    def loads(data):
+        """Parse JSON from bytes, bytearray or memoryview"""
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+# Only commandId varies between status requests, so the rest of the JSON is
+# serialized once here instead of on every send
+_STATUS_TEMPLATE = b'{"commandId":"%s","action":"status","parameters":{}}'
+
+def status_command(command_id):
+    """Return the encoded status command for command_id"""
+    return _STATUS_TEMPLATE % command_id.encode()
+
+@functools.lru_cache(maxsize=None)
+def _sock(timeout):
+    """Return a UDP socket with the given timeout, reused across calls"""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.settimeout(timeout)
+    return s
+
+def _discard_pending(s, timeout):
+    """Drop replies still queued from earlier commands that timed out"""
+    s.setblocking(False)
+    try:
+        while True:
+            try:
+                s.recv(4096)
+            except ConnectionResetError:  # Windows reports an earlier ICMP unreachable here
+                continue
+    except BlockingIOError:
+        pass
+    finally:
+        s.settimeout(timeout)
+
+def _reply_id(data):
+    """commandId echoed in a reply, or None if it has none or isn't JSON"""
+    try:
+        reply = loads(data)
+    except ValueError:
+        return None
+    if not isinstance(reply, dict):
+        return None
+    return reply.get('commandId', reply.get('command_id'))
+
+def send_json(ip, port, obj, timeout=5.0):
+    """Send obj as JSON to ip:port and return the (data, addr) reply
+    
+    The socket is shared between calls, so late replies to earlier commands
+    are discarded, and replies echoing a different commandId are skipped.
+    """
+    s = _sock(timeout)
+    _discard_pending(s, timeout)
+    s.sendto(dumps(obj), (ip, port))
+    
+    command_id = obj.get('commandId')
+    deadline = time.monotonic() + timeout
+    while True:
+        s.settimeout(max(deadline - time.monotonic(), 0.001))
+        try:
+            data, addr = s.recvfrom(4096)
+        finally:
+            s.settimeout(timeout)
+        reply_id = _reply_id(data)
+        if command_id is None or reply_id is None or reply_id == command_id:
+            return data, addr
+
+class ResponseProtocol(asyncio.DatagramProtocol):
+    """Queues incoming datagrams for the test to await"""
+
+    def __init__(self):
+        self.responses = asyncio.Queue()
+
+    def datagram_received(self, data, addr):
+        self.responses.put_nowait((data, addr))
+
+async def open_endpoint(local_addr=('0.0.0.0', 0)):
+    """Open an asyncio UDP endpoint and return (transport, protocol)"""
+    loop = asyncio.get_running_loop()
+    return await loop.create_datagram_endpoint(ResponseProtocol, local_addr=local_addr)
+
+async def wait_for_response(protocol, timeout=5.0):
+    """Return the next (data, addr) datagram, or None on timeout"""
+    try:
+        return await asyncio.wait_for(protocol.responses.get(), timeout)
+    except asyncio.TimeoutError:
+        return None
+
+# sendmmsg(2)/recvmmsg(2) move a batch of datagrams per syscall. They are
+# Linux-only, so send_many() and DatagramListener fall back to plain
+# sendto()/recvfrom() elsewhere.
+class _iovec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+class _msghdr(ctypes.Structure):
+    _fields_ = [('msg_name', ctypes.c_void_p), ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.POINTER(_iovec)), ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p), ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+class _mmsghdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _msghdr), ('msg_len', ctypes.c_uint)]
+
+def _load_libc_fn(name, argtypes):
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fn = getattr(libc, name)
+    except (OSError, AttributeError):
+        return None
+    fn.argtypes = argtypes
+    fn.restype = ctypes.c_int
+    return fn
+
+_sendmmsg = _load_libc_fn('sendmmsg', [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int])
+_recvmmsg = _load_libc_fn('recvmmsg', [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint,
+                                       ctypes.c_int, ctypes.c_void_p])
+
+def _sockaddr_in(ip, port):
+    """Pack an IPv4 address the way struct sockaddr_in lays it out"""
+    return (struct.pack('=H', socket.AF_INET) + struct.pack('!H', port)
+            + socket.inet_aton(socket.gethostbyname(ip)) + bytes(8))
+
+def send_many(sock, payload, addrs):
+    """Send the same payload to every (ip, port) in addrs, batched where possible"""
+    addrs = list(addrs)
+    if _sendmmsg is None or not addrs:
+        for addr in addrs:
+            sock.sendto(payload, addr)
+        return
+    
+    data = ctypes.create_string_buffer(payload, len(payload))
+    names = [ctypes.create_string_buffer(_sockaddr_in(ip, port), 16) for ip, port in addrs]
+    iov = _iovec(ctypes.cast(data, ctypes.c_void_p), len(payload))
+    msgs = (_mmsghdr * len(addrs))()
+    for msg, name in zip(msgs, names):
+        msg.msg_hdr.msg_name = ctypes.cast(name, ctypes.c_void_p)
+        msg.msg_hdr.msg_namelen = 16
+        msg.msg_hdr.msg_iov = ctypes.pointer(iov)
+        msg.msg_hdr.msg_iovlen = 1
+    
+    sent = 0
+    while sent < len(addrs):
+        n = _sendmmsg(sock.fileno(), ctypes.addressof(msgs) + sent * ctypes.sizeof(_mmsghdr),
+                      len(addrs) - sent, 0)
+        if n < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        sent += n
+
+def _parse_sockaddr(raw):
+    """Turn a raw sockaddr_in/sockaddr_in6 into the tuple recvfrom() would return"""
+    family = struct.unpack_from('=H', raw)[0]
+    port = struct.unpack_from('!H', raw, 2)[0]
+    if family == socket.AF_INET6:
+        return (socket.inet_ntop(socket.AF_INET6, raw[8:24]), port, 0, 0)
+    return (socket.inet_ntoa(raw[4:8]), port)
+
+class _RecvBatch:
+    """Preallocated recvmmsg() buffers for up to `count` datagrams of `size` bytes"""
+
+    def __init__(self, count=32, size=4096):
+        self.count = count
+        self.bufs = [bytearray(size) for _ in range(count)]
+        self.views = [memoryview(buf) for buf in self.bufs]
+        self.names = [ctypes.create_string_buffer(128) for _ in range(count)]  # sockaddr_storage
+        self.iovs = (_iovec * count)()
+        self.msgs = (_mmsghdr * count)()
+        for i in range(count):
+            self.iovs[i].iov_base = ctypes.addressof((ctypes.c_char * size).from_buffer(self.bufs[i]))
+            self.iovs[i].iov_len = size
+            hdr = self.msgs[i].msg_hdr
+            hdr.msg_iov = ctypes.pointer(self.iovs[i])
+            hdr.msg_iovlen = 1
+            hdr.msg_name = ctypes.cast(self.names[i], ctypes.c_void_p)
+
+    def drain(self, sock):
+        """Yield (view, addr) for every datagram queued on sock, count per syscall
+        
+        Each view points into a reused buffer and is only valid until the
+        generator is resumed.
+        """
+        fd = sock.fileno()
+        while True:
+            for msg in self.msgs:
+                msg.msg_hdr.msg_namelen = 128
+            n = _recvmmsg(fd, ctypes.addressof(self.msgs), self.count, socket.MSG_DONTWAIT, None)
+            if n < 0:
+                err = ctypes.get_errno()
+                if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                raise OSError(err, os.strerror(err))
+            for i in range(n):
+                msg = self.msgs[i]
+                addr = _parse_sockaddr(self.names[i].raw[:msg.msg_hdr.msg_namelen])
+                if msg.msg_hdr.msg_flags & socket.MSG_TRUNC:
+                    print(f"Dropped oversized datagram from {addr}")
+                    continue
+                yield self.views[i][:msg.msg_len], addr
+            if n < self.count:
+                return
+
+class DatagramListener:
+    """Blocks in select() on a UDP socket and hands each datagram to handle(data, addr)
+    
+    data is a memoryview into a reused receive buffer; handle() must copy
+    anything it keeps (bytes(data)) before returning.
+    """
+
+    def __init__(self, sock, handle):
+        self.sock = sock
+        self.handle = handle
+        self._running = True
+        # stop() writes to this pair so select() returns immediately
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(sock, selectors.EVENT_READ)
+        self._sel.register(self._wake_r, selectors.EVENT_READ)
+        # With recvmmsg, one wakeup drains a whole burst of replies
+        self._batch = _RecvBatch() if _recvmmsg else None
+        self._buf = bytearray(4096)
+        self._view = memoryview(self._buf)
+
+    def run(self):
+        """Dispatch datagrams until stop() is called"""
+        try:
+            while self._running:
+                for key, _ in self._sel.select():
+                    if key.fileobj is self._wake_r:
+                        self._running = False
+                        break
+                    try:
+                        for data, addr in self._receive():
+                            self.handle(data, addr)
+                    except OSError as e:
+                        print(f"UDP error: {e}")
+        finally:
+            self._sel.close()
+            self._wake_r.close()
+            self._wake_w.close()
+
+    def _receive(self):
+        if self._batch:
+            yield from self._batch.drain(self.sock)
+        else:
+            nbytes, addr = self.sock.recvfrom_into(self._buf)
+            yield self._view[:nbytes], addr
+
+    def stop(self):
+        """Wake the select() in run() and make it return"""
+        if self._running:
+            self._wake_w.send(b'\0')
@@ -2,14 +2,21 @@
 
 import requests
 import json
+from requests.adapters import HTTPAdapter
+
+from _udp_util import loads
+
+# One keep-alive connection is reused for every request to the server
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
 
 def check_sacn_data():
     """Check current sACN/DMX data values"""
     try:
         # Check current universe data
-        response = requests.get('http://localhost:8080/api/sacn/universe/1', timeout=5)
+        response = session.get('http://localhost:8080/api/sacn/universe/1', timeout=5)
         if response.status_code == 200:
-            data = response.json()
+            data = loads(response.content)
             print('Universe 1 DMX Data:')
             # Show first 10 channels
             dmx_data = data.get('dmx_data', [])
@@ -7,25 +7,75 @@ Tests all components, features, and integration points.
 import sys
 import os
 import time
-import threading
+import atexit
+import argparse
+import functools
+import logging
+import logging.handlers
 import tkinter as tk
 from unittest.mock import Mock, patch
 from io import StringIO
+from typing import Tuple
 
 # Add server directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
+# Test output is buffered and written out in one go rather than flushing
+# stdout for every line; flush_output() forces it out early.
+log = logging.getLogger(__name__)
+log.setLevel(logging.INFO)
+log.propagate = False
+_output = logging.handlers.MemoryHandler(
+    1000, flushLevel=logging.CRITICAL, target=logging.StreamHandler(sys.stdout))
+_output.target.setFormatter(logging.Formatter('%(message)s'))
+log.addHandler(_output)
+atexit.register(_output.flush)
+
+def flush_output():
+    """Write any buffered test output to stdout now."""
+    _output.flush()
+
+# tkinter.Tk is patched once for the whole run rather than around every
+# test, so the mocked GUI tests never spin up a Tcl interpreter.
+_tk_patcher = None
+_tk_mock = None
+
+def stub_tk():
+    """Patch tkinter.Tk for the rest of the run and return the mock."""
+    global _tk_patcher, _tk_mock
+    if _tk_patcher is None:
+        _tk_patcher = patch('tkinter.Tk')
+        _tk_mock = _tk_patcher.start()
+        atexit.register(_tk_patcher.stop)
+    return _tk_mock
+
+@functools.lru_cache(maxsize=None)
+def shared_app():
+    """Return one mocked-Tk TricorderGUIServer shared by the GUI tests.
+
+    Tests replace whatever attributes they check (send_command, widgets,
+    ...) with fresh mocks, so sharing the instance is safe.
+    """
+    from gui_server import TricorderGUIServer
+    stub_tk()
+    return TricorderGUIServer()
+
+# Set TRICORDER_TEST_STUB_TK=1 on headless machines to skip the real Tk
+# window in test_gui_creation as well.
+if os.environ.get('TRICORDER_TEST_STUB_TK') == '1':
+    stub_tk()
+
 def test_imports():
     """Test that all required modules can be imported."""
-    print("🔍 Testing imports...")
+    log.info("🔍 Testing imports...")
     
     # Test standard library imports
     try:
         import tkinter as tk
         from tkinter import ttk, scrolledtext, messagebox, filedialog
-        print("  ✓ tkinter modules available")
+        log.info("  ✓ tkinter modules available")
     except ImportError as e:
-        print(f"  ❌ tkinter import failed: {e}")
+        log.info(f"  ❌ tkinter import failed: {e}")
         return False
     
     # Test threading and other stdlib
@@ -35,32 +85,36 @@ def test_imports():
         import socket
         import logging
         import datetime
-        print("  ✓ Standard library modules available")
+        log.info("  ✓ Standard library modules available")
     except ImportError as e:
-        print(f"  ❌ Standard library import failed: {e}")
+        log.info(f"  ❌ Standard library import failed: {e}")
         return False
     
     # Test standalone server import
     try:
         from standalone_server import TricorderStandaloneServer
-        print("  ✓ Standalone server import successful")
+        log.info("  ✓ Standalone server import successful")
     except ImportError as e:
-        print(f"  ❌ Standalone server import failed: {e}")
+        log.info(f"  ❌ Standalone server import failed: {e}")
         return False
     
     # Test GUI server import
     try:
         from gui_server import TricorderGUIServer
-        print("  ✓ GUI server import successful")
+        log.info("  ✓ GUI server import successful")
     except ImportError as e:
-        print(f"  ❌ GUI server import failed: {e}")
+        log.info(f"  ❌ GUI server import failed: {e}")
         return False
     
     return True
 
 def test_gui_creation():
     """Test that GUI components can be created without errors."""
-    print("\n🖥️ Testing GUI creation...")
+    log.info("\n🖥️ Testing GUI creation...")
+    
+    if _tk_patcher is not None:
+        log.info("  - Skipped: tkinter.Tk is stubbed")
+        return True
     
     try:
         import tkinter as tk
@@ -69,11 +123,11 @@ def test_gui_creation():
         # Create root window
         root = tk.Tk()
         root.withdraw()  # Hide window during test
-        print("  ✓ Root window created")
+        log.info("  ✓ Root window created")
         
         # Test notebook widget
         notebook = ttk.Notebook(root)
-        print("  ✓ Notebook widget created")
+        log.info("  ✓ Notebook widget created")
         
         # Test various widgets
         frame = ttk.Frame(notebook)
@@ -83,28 +137,28 @@ def test_gui_creation():
         text = scrolledtext.ScrolledText(frame)
         tree = ttk.Treeview(frame)
         
-        print("  ✓ All GUI widgets created successfully")
+        log.info("  ✓ All GUI widgets created successfully")
         
         # Test color configuration (skip style test as it's not critical)
-        print("  ✓ Widget creation complete")
+        log.info("  ✓ Widget creation complete")
         
         root.destroy()
         return True
         
     except Exception as e:
-        print(f"  ❌ GUI creation failed: {e}")
+        log.info(f"  ❌ GUI creation failed: {e}")
         return False
 
 def test_server_integration():
     """Test integration with standalone server."""
-    print("\n🔧 Testing server integration...")
+    log.info("\n🔧 Testing server integration...")
     
     try:
         from standalone_server import TricorderStandaloneServer
         
         # Create server instance
         server = TricorderStandaloneServer()
-        print("  ✓ Server instance created")
+        log.info("  ✓ Server instance created")
         
         # Test server methods exist
         assert hasattr(server, 'start_server')
@@ -112,59 +166,87 @@ def test_server_integration():
         assert hasattr(server, 'discover_devices')
         assert hasattr(server, 'send_command')
         assert hasattr(server, 'get_statistics')
-        print("  ✓ Required server methods available")
+        log.info("  ✓ Required server methods available")
         
         # Test statistics
         stats = server.get_statistics()
         assert isinstance(stats, dict)
         assert 'uptime' in stats
-        print(f"  ✓ Statistics working: {len(stats)} fields")
+        log.info(f"  ✓ Statistics working: {len(stats)} fields")
         
         return True
         
     except Exception as e:
-        print(f"  ❌ Server integration failed: {e}")
+        log.info(f"  ❌ Server integration failed: {e}")
         return False
 
 def test_gui_server_instantiation():
     """Test that GUI server can be instantiated."""
-    print("\n🎛️ Testing GUI server instantiation...")
+    log.info("\n🎛️ Testing GUI server instantiation...")
     
     try:
         from gui_server import TricorderGUIServer
         
         # Mock tkinter to avoid showing actual window
-        with patch('tkinter.Tk') as mock_tk:
-            mock_root = Mock()
-            mock_tk.return_value = mock_root
-            
-            app = TricorderGUIServer()
-            print("  ✓ GUI server instance created")
-            
-            # Check that server backend was created
-            assert hasattr(app, 'server')
-            print("  ✓ Backend server integrated")
-            
-            # Check that GUI setup was attempted
-            mock_tk.assert_called_once()
-            print("  ✓ GUI initialization called")
+        mock_tk = stub_tk()
+        mock_tk.reset_mock()
+        mock_tk.return_value = Mock()
+        
+        app = TricorderGUIServer()
+        log.info("  ✓ GUI server instance created")
+        
+        # Check that server backend was created
+        assert hasattr(app, 'server')
+        log.info("  ✓ Backend server integrated")
+        
+        # Check that GUI setup was attempted
+        mock_tk.assert_called_once()
+        log.info("  ✓ GUI initialization called")
             
         return True
         
     except Exception as e:
-        print(f"  ❌ GUI server instantiation failed: {e}")
+        log.info(f"  ❌ GUI server instantiation failed: {e}")
         return False
 
+# (method name, expected RGB) pairs checked by test_led_color_functions
+LED_COLORS: Tuple[Tuple[str, Tuple[int, int, int]], ...] = (
+    ('set_led_red', (255, 0, 0)),
+    ('set_led_green', (0, 255, 0)),
+    ('set_led_blue', (0, 0, 255)),
+    ('set_led_yellow', (255, 255, 0)),
+    ('set_led_cyan', (0, 255, 255)),
+    ('set_led_magenta', (255, 0, 255)),
+    ('set_led_white', (255, 255, 255)),
+    ('set_led_off', (0, 0, 0)),
+)
+
+# Quick commands exercised by test_command_sending via send_<name>()
+QUICK_COMMANDS: Tuple[str, ...] = ('ping', 'get_status', 'display_boot_screen', 'stop_video')
+
+def check_led_color(app, method_name, expected_rgb):
+    """Check that one LED color method sends the expected RGB values."""
+    if not hasattr(app, method_name):
+        return
+    app.server.send_command.reset_mock()
+    getattr(app, method_name)()
+    # Verify the command was called with correct parameters
+    call_args = app.server.send_command.call_args
+    if call_args:
+        assert call_args[0][1] == 'set_led_color'
+        params = call_args[1]['parameters']
+        assert params['r'] == expected_rgb[0]
+        assert params['g'] == expected_rgb[1]
+        assert params['b'] == expected_rgb[2]
+        log.info(f"  ✓ {method_name} -> RGB{expected_rgb}")
+
 def test_led_color_functions():
     """Test LED color control functions."""
-    print("\n🌈 Testing LED color functions...")
+    log.info("\n🌈 Testing LED color functions...")
     
     try:
-        from gui_server import TricorderGUIServer
-        
         # Mock the GUI components
-        with patch('tkinter.Tk'):
-            app = TricorderGUIServer()
+        app = shared_app()
             
         # Mock the send_command method to track calls
         app.server.send_command = Mock()
@@ -173,46 +255,27 @@ def test_led_color_functions():
         app.selected_device = Mock()
         app.selected_device.get.return_value = "TEST_DEVICE"
         
-        # Test color functions
-        colors = [
-            ('set_led_red', (255, 0, 0)),
-            ('set_led_green', (0, 255, 0)),
-            ('set_led_blue', (0, 0, 255)),
-            ('set_led_yellow', (255, 255, 0)),
-            ('set_led_cyan', (0, 255, 255)),
-            ('set_led_magenta', (255, 0, 255)),
-            ('set_led_white', (255, 255, 255)),
-            ('set_led_off', (0, 0, 0)),
-        ]
-        
-        for method_name, expected_rgb in colors:
-            if hasattr(app, method_name):
-                getattr(app, method_name)()
-                # Verify the command was called with correct parameters
-                call_args = app.server.send_command.call_args
-                if call_args:
-                    assert call_args[0][1] == 'set_led_color'
-                    params = call_args[1]['parameters']
-                    assert params['r'] == expected_rgb[0]
-                    assert params['g'] == expected_rgb[1]
-                    assert params['b'] == expected_rgb[2]
-                    print(f"  ✓ {method_name} -> RGB{expected_rgb}")
-        
-        return True
-        
     except Exception as e:
-        print(f"  ❌ LED color functions failed: {e}")
+        log.info(f"  ❌ LED color functions failed: {e}")
         return False
+    
+    # Check every color even if an earlier one fails
+    failures = 0
+    for method_name, expected_rgb in LED_COLORS:
+        try:
+            check_led_color(app, method_name, expected_rgb)
+        except Exception as e:
+            log.info(f"  ❌ {method_name} failed: {e!r}")
+            failures += 1
+    
+    return failures == 0
 
 def test_command_sending():
     """Test command sending functionality."""
-    print("\n📡 Testing command sending...")
+    log.info("\n📡 Testing command sending...")
     
     try:
-        from gui_server import TricorderGUIServer
-        
-        with patch('tkinter.Tk'):
-            app = TricorderGUIServer()
+        app = shared_app()
         
         # Mock the server's send_command method
         app.server.send_command = Mock(return_value=True)
@@ -231,31 +294,27 @@ def test_command_sending():
         if hasattr(app, 'send_custom_command'):
             app.send_custom_command()
             app.server.send_command.assert_called()
-            print("  ✓ Custom command sending works")
+            log.info("  ✓ Custom command sending works")
         
         # Test quick commands
-        quick_commands = ['ping', 'get_status', 'display_boot_screen', 'stop_video']
-        for cmd in quick_commands:
+        for cmd in QUICK_COMMANDS:
             method_name = f'send_{cmd}'
             if hasattr(app, method_name):
                 getattr(app, method_name)()
-                print(f"  ✓ Quick command: {cmd}")
+                log.info(f"  ✓ Quick command: {cmd}")
         
         return True
         
     except Exception as e:
-        print(f"  ❌ Command sending failed: {e}")
+        log.info(f"  ❌ Command sending failed: {e}")
         return False
 
 def test_device_management():
     """Test device management functionality."""
-    print("\n📱 Testing device management...")
+    log.info("\n📱 Testing device management...")
     
     try:
-        from gui_server import TricorderGUIServer
-        
-        with patch('tkinter.Tk'):
-            app = TricorderGUIServer()
+        app = shared_app()
         
         # Mock device data
         test_devices = {
@@ -285,7 +344,7 @@ def test_device_management():
         # Test device list update
         if hasattr(app, 'update_device_list'):
             app.update_device_list()
-            print("  ✓ Device list update called")
+            log.info("  ✓ Device list update called")
         
         # Test device selection
         if hasattr(app, 'on_device_select'):
@@ -295,23 +354,20 @@ def test_device_management():
             app.device_tree.item.return_value = {'values': ['TRICORDER_001', '192.168.1.100', '0.1', 'online']}
             
             app.on_device_select(mock_event)
-            print("  ✓ Device selection handling works")
+            log.info("  ✓ Device selection handling works")
         
         return True
         
     except Exception as e:
-        print(f"  ❌ Device management failed: {e}")
+        log.info(f"  ❌ Device management failed: {e}")
         return False
 
 def test_logging_functionality():
     """Test logging and display functionality."""
-    print("\n📝 Testing logging functionality...")
+    log.info("\n📝 Testing logging functionality...")
     
     try:
-        from gui_server import TricorderGUIServer
-        
-        with patch('tkinter.Tk'):
-            app = TricorderGUIServer()
+        app = shared_app()
         
         # Mock log text widget
         app.log_text = Mock()
@@ -327,28 +383,25 @@ def test_logging_functionality():
             
             for level, message in test_messages:
                 app.add_log_message(level, message)
-                print(f"  ✓ Log message added: {level}")
+                log.info(f"  ✓ Log message added: {level}")
         
         # Test log clearing
         if hasattr(app, 'clear_log'):
             app.clear_log()
-            print("  ✓ Log clearing works")
+            log.info("  ✓ Log clearing works")
         
         return True
         
     except Exception as e:
-        print(f"  ❌ Logging functionality failed: {e}")
+        log.info(f"  ❌ Logging functionality failed: {e}")
         return False
 
 def test_statistics_display():
     """Test statistics display functionality."""
-    print("\n📊 Testing statistics display...")
+    log.info("\n📊 Testing statistics display...")
     
     try:
-        from gui_server import TricorderGUIServer
-        
-        with patch('tkinter.Tk'):
-            app = TricorderGUIServer()
+        app = shared_app()
         
         # Mock statistics text widget
         app.stats_text = Mock()
@@ -365,27 +418,24 @@ def test_statistics_display():
         # Test statistics update
         if hasattr(app, 'update_statistics'):
             app.update_statistics()
-            print("  ✓ Statistics update called")
+            log.info("  ✓ Statistics update called")
             
         # Verify statistics were retrieved
         app.server.get_statistics.assert_called()
-        print("  ✓ Statistics retrieval works")
+        log.info("  ✓ Statistics retrieval works")
         
         return True
         
     except Exception as e:
-        print(f"  ❌ Statistics display failed: {e}")
+        log.info(f"  ❌ Statistics display failed: {e}")
         return False
 
 def test_server_control():
     """Test server start/stop control."""
-    print("\n⚡ Testing server control...")
+    log.info("\n⚡ Testing server control...")
     
     try:
-        from gui_server import TricorderGUIServer
-        
-        with patch('tkinter.Tk'):
-            app = TricorderGUIServer()
+        app = shared_app()
         
         # Mock server control methods
         app.server.start_server = Mock(return_value=True)
@@ -400,24 +450,24 @@ def test_server_control():
         if hasattr(app, 'toggle_server'):
             app.toggle_server()
             app.server.start_server.assert_called()
-            print("  ✓ Server start called")
+            log.info("  ✓ Server start called")
         
         # Test server status check
         app.server.is_running.return_value = True
         if hasattr(app, 'update_server_status'):
             app.update_server_status()
-            print("  ✓ Server status update works")
+            log.info("  ✓ Server status update works")
         
         return True
         
     except Exception as e:
-        print(f"  ❌ Server control failed: {e}")
+        log.info(f"  ❌ Server control failed: {e}")
         return False
 
 def run_full_test_suite():
     """Run the complete test suite."""
-    print("🧪 Tricorder GUI Server Test Suite v0.1")
-    print("=" * 50)
+    log.info("🧪 Tricorder GUI Server Test Suite v0.1")
+    log.info("=" * 50)
     
     tests = [
         ("Import Tests", test_imports),
@@ -437,34 +487,38 @@ def run_full_test_suite():
     
     for test_name, test_func in tests:
         try:
-            print(f"\n{'='*20} {test_name} {'='*20}")
+            log.info(f"\n{'='*20} {test_name} {'='*20}")
             if test_func():
-                print(f"✅ {test_name} PASSED")
+                log.info(f"✅ {test_name} PASSED")
                 passed += 1
             else:
-                print(f"❌ {test_name} FAILED")
+                log.info(f"❌ {test_name} FAILED")
                 failed += 1
         except Exception as e:
-            print(f"❌ {test_name} CRASHED: {e}")
+            log.info(f"❌ {test_name} CRASHED: {e}")
             failed += 1
     
-    print("\n" + "="*50)
-    print(f"📊 TEST RESULTS:")
-    print(f"   ✅ Passed: {passed}")
-    print(f"   ❌ Failed: {failed}")
-    print(f"   📈 Success Rate: {(passed/(passed+failed)*100):.1f}%")
+    log.info("\n" + "="*50)
+    log.info(f"📊 TEST RESULTS:")
+    log.info(f"   ✅ Passed: {passed}")
+    log.info(f"   ❌ Failed: {failed}")
+    log.info(f"   📈 Success Rate: {(passed/(passed+failed)*100):.1f}%")
     
     if failed == 0:
-        print("\n🎉 ALL TESTS PASSED! GUI Server is ready for deployment!")
+        log.info("\n🎉 ALL TESTS PASSED! GUI Server is ready for deployment!")
         return True
     else:
-        print(f"\n⚠️  {failed} test(s) failed. Please review the issues above.")
+        log.info(f"\n⚠️  {failed} test(s) failed. Please review the issues above.")
         return False
 
-def test_manual_gui():
-    """Manual GUI test - creates actual window for visual inspection."""
-    print("\n🖼️ Manual GUI Test (Visual Inspection)")
-    print("This will create a GUI window for 10 seconds...")
+def test_manual_gui(duration=1):
+    """Manual GUI test - creates actual window for visual inspection.
+
+    The window closes after ``duration`` seconds; 0 draws it once and
+    closes without entering the Tk main loop.
+    """
+    log.info("\n🖼️ Manual GUI Test (Visual Inspection)")
+    log.info(f"This will create a GUI window for {duration:g} seconds...")
     
     try:
         from gui_server import TricorderGUIServer
@@ -472,39 +526,47 @@ def test_manual_gui():
         # Create GUI (this will show actual window)
         app = TricorderGUIServer()
         
-        print("✓ GUI window should be visible now")
-        print("  - Check that all tabs are present")
-        print("  - Check that buttons are visible")
-        print("  - Check that text areas are properly formatted")
-        print("  - Window will close automatically in 10 seconds")
-        
-        # Run for 10 seconds then close
-        def close_after_delay():
-            time.sleep(10)
-            app.root.quit()
-            
-        threading.Thread(target=close_after_delay, daemon=True).start()
-        app.root.mainloop()
+        log.info("✓ GUI window should be visible now")
+        log.info("  - Check that all tabs are present")
+        log.info("  - Check that buttons are visible")
+        log.info("  - Check that text areas are properly formatted")
+        log.info(f"  - Window will close automatically in {duration:g} seconds")
+        
+        flush_output()
+        if duration > 0:
+            # Let Tk's own timer end the main loop instead of a sleeping thread
+            app.root.after(int(duration * 1000), app.root.quit)
+            app.root.mainloop()
+        else:
+            app.root.update_idletasks()
+            app.root.update()
+            app.root.destroy()
         
-        print("✓ Manual GUI test completed")
+        log.info("✓ Manual GUI test completed")
         return True
         
     except Exception as e:
-        print(f"❌ Manual GUI test failed: {e}")
+        log.info(f"❌ Manual GUI test failed: {e}")
         return False
 
 if __name__ == "__main__":
-    # Check command line arguments
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--manual":
-            test_manual_gui()
-        elif sys.argv[1] == "--quick":
-            # Run just the essential tests
-            test_imports()
-            test_gui_creation()
-            test_server_integration()
-        else:
-            print("Usage: test_gui_comprehensive.py [--manual|--quick]")
+    parser = argparse.ArgumentParser(description="Tricorder GUI Server test suite")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--manual", action="store_true",
+                      help="open the real GUI for visual inspection")
+    mode.add_argument("--quick", action="store_true",
+                      help="run just the essential tests")
+    parser.add_argument("--duration", type=float, default=10,
+                        help="seconds to keep the manual GUI open (0 draws it once)")
+    args = parser.parse_args()
+    
+    if args.manual:
+        test_manual_gui(args.duration)
+    elif args.quick:
+        # Run just the essential tests
+        test_imports()
+        test_gui_creation()
+        test_server_integration()
     else:
         # Run full automated test suite
         success = run_full_test_suite()
@@ -1,47 +1,62 @@
 #!/usr/bin/env python3
 
-import socket
-import json
+import argparse
+import asyncio
 import time
+from typing import Tuple
 
-def test_led_colors():
-    """Test multiple LED colors to verify the command system is working"""
-    udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    udp_socket.settimeout(5)
+from _udp_util import dumps, open_endpoint, wait_for_response
+
+DEVICE_ADDR = ('192.168.1.48', 8888)
+RESPONSE_TIMEOUT = 5
+COLOR_DELAY = 3  # Seconds each color stays on the LEDs
+
+# (name, (r, g, b)) pairs cycled through by the color test
+COLORS: Tuple[Tuple[str, Tuple[int, int, int]], ...] = (
+    ('GREEN', (0, 255, 0)),
+    ('BLUE', (0, 0, 255)),
+    ('YELLOW', (255, 255, 0)),
+    ('WHITE', (255, 255, 255)),
+    ('MAGENTA', (255, 0, 255)),
+)
 
-    colors = [
-        {'r': 0, 'g': 255, 'b': 0, 'name': 'GREEN'},
-        {'r': 0, 'g': 0, 'b': 255, 'name': 'BLUE'},
-        {'r': 255, 'g': 255, 'b': 0, 'name': 'YELLOW'},
-        {'r': 255, 'g': 255, 'b': 255, 'name': 'WHITE'},
-        {'r': 255, 'g': 0, 'b': 255, 'name': 'MAGENTA'}
-    ]
+async def run_color_test(visual=True):
+    transport, protocol = await open_endpoint()
 
+    try:
+        for i, (name, (r, g, b)) in enumerate(COLORS):
+            command = {
+                'action': 'set_led_color',
+                'r': r, 
+                'g': g, 
+                'b': b,
+                'commandId': f'test_{name.lower()}_{int(time.time())}'
+            }
+            
+            print(f'{i+1}. Testing {name} (R:{r}, G:{g}, B:{b})')
+            transport.sendto(dumps(command), DEVICE_ADDR)
+            
+            # The color display delay runs while we wait for the response
+            waits = [wait_for_response(protocol, RESPONSE_TIMEOUT)]
+            if visual:
+                waits.append(asyncio.sleep(COLOR_DELAY))
+            result = (await asyncio.gather(*waits))[0]
+            
+            if result:
+                print(f'   ✓ Response: {result[0].decode()}')
+            else:
+                print('   ✗ No response received')
+    finally:
+        transport.close()
+
+def test_led_colors(visual=True):
+    """Test multiple LED colors to verify the command system is working"""
     print("Testing LED colors...")
     print("Watch the ESP32 serial output and physical LEDs")
     print("=" * 50)
 
-    for i, color in enumerate(colors):
-        command = {
-            'action': 'set_led_color',
-            'r': color['r'], 
-            'g': color['g'], 
-            'b': color['b'],
-            'commandId': f'test_{color["name"].lower()}_{int(time.time())}'
-        }
-        
-        print(f'{i+1}. Testing {color["name"]} (R:{color["r"]}, G:{color["g"]}, B:{color["b"]})')
-        udp_socket.sendto(json.dumps(command).encode(), ('192.168.1.48', 8888))
-        
-        try:
-            response, addr = udp_socket.recvfrom(1024)
-            print(f'   ✓ Response: {response.decode()}')
-        except socket.timeout:
-            print('   ✗ No response received')
-        
-        time.sleep(3)  # Wait 3 seconds between colors
-
-    udp_socket.close()
+    asyncio.run(run_color_test(visual))
+
     print("\nColor test complete!")
     print("If LEDs didn't change, check:")
     print("1. LED strip power connection")
@@ -49,4 +64,7 @@ def test_led_colors():
     print("3. LED strip type (WS2812B)")
 
 if __name__ == "__main__":
-    test_led_colors()
+    parser = argparse.ArgumentParser(description="Cycle the LED strip through test colors")
+    parser.add_argument("--no-visual", action="store_true",
+                        help="don't hold each color on the LEDs between commands")
+    test_led_colors(visual=not parser.parse_args().no_visual)
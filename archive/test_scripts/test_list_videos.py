@@ -3,40 +3,47 @@
 Test list_videos command to see raw response
 """
 
-import socket
+import asyncio
+import itertools
 import json
-import uuid
-import time
 
-def test_list_videos():
-    """Test the list_videos command"""
-    
-    # Create UDP socket
-    udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    udp_socket.bind(('', 8889))  # Use different port to avoid conflict
-    udp_socket.settimeout(5.0)
+from _udp_util import dumps, open_endpoint, wait_for_response
+
+_command_counter = itertools.count()
+
+def next_command_id():
+    """Return a process-unique command ID for tracking responses"""
+    return f"t{next(_command_counter):08x}"
+
+async def run_list_videos():
+    # Use different port to avoid conflict
+    transport, protocol = await open_endpoint(('0.0.0.0', 8889))
     
     print("Testing list_videos command...")
     
     try:
         # Send list_videos command
-        command_id = str(uuid.uuid4())
+        command_id = next_command_id()
         command = {
             'commandId': command_id,
             'action': 'list_videos',
             'parameters': {}
         }
         
-        message = json.dumps(command)
-        print(f"Sending: {message}")
+        message = dumps(command)
+        print(f"Sending: {message.decode('utf-8')}")
         
         # Send to device (use port 8888 for device)
-        udp_socket.sendto(message.encode('utf-8'), ('192.168.1.48', 8888))
+        transport.sendto(message, ('192.168.1.48', 8888))
         
         print("Waiting for response...")
         
         # Wait for response
-        data, addr = udp_socket.recvfrom(4096)
+        result = await wait_for_response(protocol, 5.0)
+        if result is None:
+            print("Error: timed out waiting for response")
+            return
+        data, addr = result
         response = data.decode('utf-8')
         print(f"\nRaw response from {addr}:")
         print(response)
@@ -60,7 +67,11 @@ def test_list_videos():
     except Exception as e:
         print(f"Error: {e}")
     finally:
-        udp_socket.close()
+        transport.close()
+
+def test_list_videos():
+    """Test the list_videos command"""
+    asyncio.run(run_list_videos())
 
 if __name__ == "__main__":
     test_list_videos()
@@ -4,38 +4,44 @@ Test script for Polyinoculator devices
 Tests UDP control commands for ESP32-C3 based polyinoculators
 """
 
-import socket
+import argparse
+import itertools
 import json
 import time
-import uuid
+
+from _udp_util import send_json
 
 # Configuration
 POLYINOCULATOR_IP = "192.168.1.49"  # Update with actual IP
 UDP_PORT = 8888
 
+# Only pause between commands when someone is watching the LEDs;
+# otherwise each command's response is enough to move on.
+VISUAL = False
+
+_command_counter = itertools.count()
+
+def next_command_id():
+    """Return a process-unique command ID for tracking responses"""
+    return f"t{next(_command_counter):08x}"
+
+def pause(seconds):
+    """Hold the current effect on screen in --visual mode"""
+    if VISUAL:
+        time.sleep(seconds)
+
 def send_command(ip, command_data):
     """Send UDP command to polyinoculator"""
     try:
-        # Create UDP socket
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.settimeout(5.0)
-        
         # Add command ID for tracking
-        command_data["commandId"] = str(uuid.uuid4())
-        
-        # Convert to JSON
-        json_data = json.dumps(command_data)
-        print(f"Sending to {ip}: {json_data}")
+        command_data["commandId"] = next_command_id()
+        print(f"Sending to {ip}: {command_data}")
         
-        # Send command
-        sock.sendto(json_data.encode(), (ip, UDP_PORT))
-        
-        # Wait for response
-        response, addr = sock.recvfrom(1024)
+        # Send command and wait for response
+        response, addr = send_json(ip, UDP_PORT, command_data)
         response_data = json.loads(response.decode())
         print(f"Response from {addr}: {response_data}")
         
-        sock.close()
         return response_data
         
     except Exception as e:
@@ -130,60 +136,66 @@ def test_status():
 
 def main():
     """Run all polyinoculator tests"""
+    global VISUAL
+    parser = argparse.ArgumentParser(description="Polyinoculator UDP test suite")
+    parser.add_argument("--visual", action="store_true",
+                        help="pause between commands so effects can be watched")
+    VISUAL = parser.parse_args().visual
+    
     print("🧪 Starting Polyinoculator Test Suite")
     print("=" * 50)
     
     # Test discovery
     test_polyinoculator_discovery()
-    time.sleep(1)
+    pause(1)
     
     # Test status
     test_status()
-    time.sleep(1)
+    pause(1)
     
     # Test basic LED control
     test_set_led_color(255, 0, 0)  # Red
-    time.sleep(2)
+    pause(2)
     
     test_set_led_color(0, 255, 0)  # Green
-    time.sleep(2)
+    pause(2)
     
     test_set_led_color(0, 0, 255)  # Blue
-    time.sleep(2)
+    pause(2)
     
     # Test brightness
     test_set_brightness(64)  # Dim
-    time.sleep(1)
+    pause(1)
     
     test_set_brightness(255)  # Bright
-    time.sleep(1)
+    pause(1)
     
     # Test individual LEDs
     test_set_led_color(0, 0, 0)  # Clear all
-    time.sleep(1)
+    pause(1)
     
     for i in range(3):  # Test first 3 LEDs
         test_set_individual_led(i, 255, 0, 255)  # Magenta
-        time.sleep(0.5)
+        pause(0.5)
     
-    time.sleep(1)
+    pause(1)
     
     # Test effects
     test_rainbow()
-    time.sleep(3)
+    pause(3)
     
     test_scanner(255, 255, 0)  # Yellow scanner
-    time.sleep(3)
+    pause(3)
     
     test_pulse(0, 255, 255)  # Cyan pulse
-    time.sleep(3)
+    pause(3)
     
     # Test SACN toggle
     test_toggle_sacn()
-    time.sleep(1)
+    pause(1)
     
     test_toggle_sacn()  # Toggle back
-    time.sleep(1)
+    pause(1)
     
     # Clear LEDs
     test_set_led_color(0, 0, 0)
@@ -3,17 +3,35 @@
 import socket
 import struct
 import time
+from typing import Tuple
 
-def send_sacn_data(universe=1, channels_data=None):
-    """Send sACN E1.31 data to control LEDs properly"""
-    
-    if channels_data is None:
-        # Default: Set first 3 channels to bright red
-        channels_data = [255, 0, 0] + [0] * 509  # 512 channels total
-    
-    # sACN E1.31 packet header (simplified)
-    packet = bytearray(638)  # E1.31 packet size
-    
+SACN_PORT = 5568
+DMX_START = 126  # Offset of the first DMX slot after the start code
+MULTICAST_TTL = 16
+LOCAL_INTERFACE = "0.0.0.0"  # Set to this machine's LAN IP on multi-homed hosts
+
+_sock = None
+
+def get_sacn_socket():
+    """Return the shared multicast socket, creating it on first use"""
+    global _sock
+    if _sock is None:
+        _sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        _sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL,
+                         struct.pack("B", MULTICAST_TTL))
+        _sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF,
+                         socket.inet_aton(LOCAL_INTERFACE))
+    return _sock
+
+def close_sacn_socket():
+    """Close the shared multicast socket"""
+    global _sock
+    if _sock is not None:
+        _sock.close()
+        _sock = None
+
+def build_packet_template(packet):
+    """Fill in the fixed sACN E1.31 header fields (simplified)"""
     # ACN Root Layer
     packet[0:2] = struct.pack(">H", 0x0010)  # Preamble Size
     packet[2:4] = struct.pack(">H", 0x0000)  # Post-amble Size  
@@ -25,12 +43,11 @@ def send_sacn_data(universe=1, channels_data=None):
     # Framing Layer
     packet[38:40] = struct.pack(">H", 0x721b)  # Flags and Length
     packet[40:44] = struct.pack(">I", 0x00000002)  # Vector
-    packet[44:108] = b"Tricorder sACN Test\x00" + b"\x00" * 43  # Source Name
+    packet[44:108] = b"Tricorder sACN Test\x00" + b"\x00" * 44  # Source Name
     packet[108] = 100  # Priority
     packet[109:111] = struct.pack(">H", 0x0000)  # Reserved
     packet[111] = 0  # Sequence Number
     packet[112] = 0  # Options
-    packet[113:115] = struct.pack(">H", universe)  # Universe
     
     # DMP Layer
     packet[115:117] = struct.pack(">H", 0x720b)  # Flags and Length
@@ -40,52 +57,68 @@ def send_sacn_data(universe=1, channels_data=None):
     packet[121:123] = struct.pack(">H", 0x0001)  # Address Increment
     packet[123:125] = struct.pack(">H", 513)  # Property value count (512 + start code)
     packet[125] = 0  # Start Code
+
+# The packet is built once and patched in place for every send, so repeated
+# calls only copy the universe number and the 512 DMX slots.
+_packet = bytearray(638)  # E1.31 packet size
+build_packet_template(_packet)
+_packet_view = memoryview(_packet)
+
+def send_sacn_data(universe=1, channels_data=None):
+    """Send sACN E1.31 data to control LEDs properly"""
+    
+    if channels_data is None:
+        # Default: Set first 3 channels to bright red
+        channels_data = [255, 0, 0] + [0] * 509  # 512 channels total
+    
+    _packet[113:115] = struct.pack(">H", universe)  # Universe
     
     # DMX Data (512 channels)
-    for i, value in enumerate(channels_data[:512]):
-        packet[126 + i] = value
+    _packet[DMX_START:] = bytes(channels_data[:512]).ljust(512, b"\x00")
     
     # Send to multicast address
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    sock = get_sacn_socket()
     
     multicast_addr = f"239.255.{(universe >> 8) & 0xFF}.{universe & 0xFF}"
     
-    print(f"Sending sACN data to universe {universe} at {multicast_addr}:5568")
+    print(f"Sending sACN data to universe {universe} at {multicast_addr}:{SACN_PORT}")
     print(f"Channel 1-3: R={channels_data[0]} G={channels_data[1]} B={channels_data[2]}")
     
     try:
-        sock.sendto(packet, (multicast_addr, 5568))
+        if hasattr(sock, "sendmsg"):
+            sock.sendmsg([_packet_view], [], 0, (multicast_addr, SACN_PORT))
+        else:  # Windows has no sendmsg; sendto still takes the buffer as-is
+            sock.sendto(_packet_view, (multicast_addr, SACN_PORT))
         print("✓ sACN packet sent successfully")
     except Exception as e:
         print(f"❌ Error sending sACN: {e}")
-    finally:
-        sock.close()
+
+# (RGB, name) pairs shown by test_sacn_colors
+SACN_COLORS: Tuple[Tuple[Tuple[int, int, int], str], ...] = (
+    ((255, 0, 0), "RED"),
+    ((0, 255, 0), "GREEN"),
+    ((0, 0, 255), "BLUE"),
+    ((255, 255, 0), "YELLOW"),
+    ((255, 0, 255), "MAGENTA"),
+    ((0, 255, 255), "CYAN"),
+    ((255, 255, 255), "WHITE"),
+)
 
 def test_sacn_colors():
     """Test different colors via sACN"""
     
-    colors = [
-        ([255, 0, 0], "RED"),
-        ([0, 255, 0], "GREEN"), 
-        ([0, 0, 255], "BLUE"),
-        ([255, 255, 0], "YELLOW"),
-        ([255, 0, 255], "MAGENTA"),
-        ([0, 255, 255], "CYAN"),
-        ([255, 255, 255], "WHITE")
-    ]
-    
     print("Testing sACN LED control...")
     print("This should properly control the LEDs if sACN is the issue")
     print("=" * 60)
     
-    for rgb, name in colors:
-        channels = rgb + [0] * 509  # RGB + 509 zero channels
+    for rgb, name in SACN_COLORS:
+        channels = list(rgb) + [0] * 509  # RGB + 509 zero channels
         print(f"\\nSetting LEDs to {name}...")
         send_sacn_data(universe=1, channels_data=channels)
         time.sleep(3)
         
     print("\\nsACN color test complete!")
+    close_sacn_socket()
 
 if __name__ == "__main__":
     test_sacn_colors()
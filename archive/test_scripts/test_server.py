@@ -3,60 +3,102 @@
 Minimal test server to debug discovery issues
 """
 
-import socket
 import json
-import uuid
+import os
+import socket
+import secrets
 from flask import Flask, jsonify, request
 import threading
 import time
 
+from _udp_util import DatagramListener, dumps, loads, send_many, status_command
+
 app = Flask(__name__)
 
-# Global UDP socket
+# Global UDP socket used for sending; udp_sockets holds every listening socket
 udp_socket = None
-devices = {}
+udp_sockets = []
+
+# With SO_REUSEPORT the kernel spreads incoming replies across this many
+# sockets, each drained by its own listener thread. Opt-in, because it also
+# lets any other process bind 8888 and silently take a share of the replies
+REUSE_PORT = os.environ.get('TRICORDER_REUSEPORT') == '1' and hasattr(socket, 'SO_REUSEPORT')
+LISTENER_SOCKETS = 2 if REUSE_PORT else 1
+RCVBUF_BYTES = 4 * 1024 * 1024  # Room to absorb a burst of replies
+# Linux only: pin the server to this CPU, ideally the one handling the NIC's IRQs
+UDP_CPU = os.environ.get('TRICORDER_UDP_CPU')
+
+# device_id -> (last_seen, its /api/devices entry already encoded as JSON)
+_device_rows = {}
+# /api/devices body, rebuilt by get_devices only after the devices change
+_devices_json_cache = b'[]'
+_devices_dirty = False
+_devices_lock = threading.Lock()
+
+# Devices silent for this many seconds are dropped from the list
+DEVICE_TIMEOUT = 300
+
+# Devices probed by /api/discover; add more IPs to fan out
+DISCOVERY_TARGETS = ['192.168.1.48']
+
+def make_udp_socket():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if REUSE_PORT:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF_BYTES)
+    sock.bind(('', 8888))
+    return sock
 
 def init_udp():
     global udp_socket
     try:
-        udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        udp_socket.bind(('', 8888))
-        udp_socket.settimeout(1.0)
-        print("UDP socket initialized on port 8888")
+        udp_sockets[:] = [make_udp_socket() for _ in range(LISTENER_SOCKETS)]
+        udp_socket = udp_sockets[0]
+        if UDP_CPU is not None and hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, {int(UDP_CPU)})
+        print(f"UDP socket initialized on port 8888 ({LISTENER_SOCKETS} listener sockets)")
         return True
-    except Exception as e:
+    except (OSError, ValueError) as e:
         print(f"Failed to initialize UDP socket: {e}")
         return False
 
-def listen_udp():
-    global udp_socket
-    while True:
-        try:
-            if udp_socket:
-                data, addr = udp_socket.recvfrom(4096)
-                message = data.decode('utf-8')
-                print(f"Received from {addr}: {message}")
-                
-                # Parse and store device info
-                try:
-                    response = json.loads(message)
-                    if 'deviceId' in response:
-                        device_id = response['deviceId']
-                        devices[device_id] = {
-                            'device_id': device_id,
-                            'ip_address': addr[0],
-                            'last_response': response,
-                            'last_seen': time.time()
-                        }
-                        print(f"Updated device: {device_id} at {addr[0]}")
-                except:
-                    pass
-                    
-        except socket.timeout:
-            continue
-        except Exception as e:
-            print(f"UDP error: {e}")
-            time.sleep(1)
+def _row_bytes(device_id, ip_address, response_json, last_seen):
+    """Assemble one device entry from already-encoded pieces"""
+    return (b'{"device_id":' + dumps(device_id) +
+            b',"ip_address":' + dumps(ip_address) +
+            b',"last_response":' + response_json +
+            b',"last_seen":' + repr(last_seen).encode() + b'}')
+
+def prune_stale_devices(max_age=DEVICE_TIMEOUT):
+    """Drop devices not heard from in max_age seconds; caller holds _devices_lock
+    
+    Returns True if any device was removed.
+    """
+    cutoff = time.time() - max_age
+    stale = [device_id for device_id, (seen, _) in _device_rows.items() if seen < cutoff]
+    for device_id in stale:
+        del _device_rows[device_id]
+    return bool(stale)
+
+def handle_datagram(data, addr):
+    global _devices_dirty
+    message = str(data, 'utf-8', 'replace')
+    print(f"Received from {addr}: {message}")
+    
+    # Parse and store device info
+    try:
+        response = loads(data)
+        if 'deviceId' in response:
+            device_id = response['deviceId']
+            now = time.time()
+            # The datagram is already valid JSON, so it is embedded as-is
+            row = _row_bytes(device_id, addr[0], data, now)
+            with _devices_lock:
+                _device_rows[device_id] = (now, row)
+                _devices_dirty = True
+            print(f"Updated device: {device_id} at {addr[0]}")
+    except (json.JSONDecodeError, UnicodeDecodeError, TypeError, KeyError):  # orjson's JSONDecodeError subclasses json's
+        pass
 
 @app.route('/api/discover')
 def discover():
@@ -65,20 +107,13 @@ def discover():
         return jsonify({'error': 'UDP socket not initialized'}), 500
     
     try:
-        # Test with known device
-        command_id = str(uuid.uuid4())
-        command = {
-            'commandId': command_id,
-            'action': 'status',
-            'parameters': {}
-        }
-        
-        message = json.dumps(command)
-        udp_socket.sendto(message.encode('utf-8'), ('192.168.1.48', 8888))
-        print(f"Sent discovery command: {message}")
+        # Probe every known device in one batched send
+        message = status_command(secrets.token_hex(8))
+        send_many(udp_socket, message, [(ip, 8888) for ip in DISCOVERY_TARGETS])
+        print(f"Sent discovery command: {message.decode('utf-8')}")
         
-        return jsonify({'status': 'Discovery command sent to 192.168.1.48'})
-    except Exception as e:
+        return jsonify({'status': f"Discovery command sent to {', '.join(DISCOVERY_TARGETS)}"})
+    except OSError as e:
         print(f"Discovery error: {e}")
         return jsonify({'error': str(e)}), 500
 
@@ -88,33 +123,37 @@ def add_device():
     data = request.get_json()
     print(f"Request data: {data}")
     
-    ip_address = data.get('ip_address')
-    if not ip_address:
+    # Accept a single ip_address or a list under ip_addresses
+    ip_addresses = data.get('ip_addresses') or [data.get('ip_address')]
+    ip_addresses = [ip for ip in ip_addresses if ip]
+    if not ip_addresses:
         return jsonify({'error': 'IP address required'}), 400
+    ip_address = ', '.join(ip_addresses)
     
     if not udp_socket:
         return jsonify({'error': 'UDP socket not initialized'}), 500
     
     try:
-        command_id = str(uuid.uuid4())
-        command = {
-            'commandId': command_id,
-            'action': 'status',
-            'parameters': {}
-        }
-        
-        message = json.dumps(command)
-        udp_socket.sendto(message.encode('utf-8'), (ip_address, 8888))
-        print(f"Sent command to {ip_address}: {message}")
+        message = status_command(secrets.token_hex(8))
+        send_many(udp_socket, message, [(ip, 8888) for ip in ip_addresses])
+        print(f"Sent command to {ip_address}: {message.decode('utf-8')}")
         
         return jsonify({'status': f'Command sent to {ip_address}'})
-    except Exception as e:
+    except OSError as e:
         print(f"Add device error: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/devices')
 def get_devices():
-    return jsonify(list(devices.values()))
+    # Pruning and re-joining happen here, once per poll, rather than on
+    # every datagram; the cached bytes are reused while nothing changed
+    global _devices_json_cache, _devices_dirty
+    with _devices_lock:
+        if prune_stale_devices() or _devices_dirty:
+            _devices_json_cache = b'[' + b','.join(row for _, row in _device_rows.values()) + b']'
+            _devices_dirty = False
+        body = _devices_json_cache
+    return body, 200, {'Content-Type': 'application/json'}
 
 @app.route('/')
 def index():
@@ -170,13 +209,22 @@ if __name__ == '__main__':
     print("Starting test server...")
     
     if init_udp():
-        # Start UDP listener thread
-        udp_thread = threading.Thread(target=listen_udp, daemon=True)
-        udp_thread.start()
-        print("UDP listener thread started")
+        # Start a UDP listener thread per socket; each sleeps in select() until a datagram arrives
+        listeners = [DatagramListener(sock, handle_datagram) for sock in udp_sockets]
+        for listener in listeners:
+            threading.Thread(target=listener.run, daemon=True).start()
+        print(f"{len(listeners)} UDP listener threads started")
         
         # Start web server
         print("Starting web server on port 5000...")
-        app.run(host='0.0.0.0', port=5000, debug=True)
+        try:
+            try:
+                from waitress import serve
+                serve(app, host='0.0.0.0', port=5000, threads=8)
+            except ImportError:  # waitress is optional; fall back to the threaded dev server
+                app.run(host='0.0.0.0', port=5000, threaded=True)
+        finally:
+            for listener in listeners:
+                listener.stop()
     else:
         print("Failed to start - UDP socket initialization failed")
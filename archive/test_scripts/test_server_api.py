@@ -1,6 +1,11 @@
 import requests
 import json
 import time
+from requests.adapters import HTTPAdapter
+
+# One keep-alive connection is reused for every request to the server
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
 
 def test_server_api():
     """Test the server API endpoints"""
@@ -14,8 +19,8 @@ def test_server_api():
     # Test 1: Add device by IP
     print(f"\n📡 Test 1: Adding device at {device_ip}")
     
-    response = requests.post(f"{base_url}/api/add_device", 
-                           json={"ip_address": device_ip})
+    response = session.post(f"{base_url}/api/add_device", 
+                          json={"ip_address": device_ip})
     
     print(f"   Status Code: {response.status_code}")
     print(f"   Response: {response.json()}")
@@ -27,7 +32,7 @@ def test_server_api():
     # Test 2: Check devices list
     print("\n📋 Test 2: Checking devices list")
     
-    response = requests.get(f"{base_url}/api/devices")
+    response = session.get(f"{base_url}/api/devices")
     
     print(f"   Status Code: {response.status_code}")
     devices = response.json()
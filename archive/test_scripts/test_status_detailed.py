@@ -7,6 +7,8 @@ import socket
 import json
 import time
 
+from _udp_util import loads, status_command
+
 def test_status():
     # Create UDP socket
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -17,18 +19,13 @@ def test_status():
     esp32_port = 8888
 
     # Send status request
-    command = {
-        'action': 'status',
-        'commandId': 'status_test_' + str(int(time.time()))
-    }
-
-    command_json = json.dumps(command)
+    command_json = status_command('status_test_' + str(int(time.time())))
     print(f'Sending status request to {esp32_ip}:{esp32_port}')
-    print(f'Command: {command_json}')
+    print(f'Command: {command_json.decode()}')
 
     try:
         # Send command
-        sock.sendto(command_json.encode(), (esp32_ip, esp32_port))
+        sock.sendto(command_json, (esp32_ip, esp32_port))
         
         # Wait for response
         print('Waiting for response...')
@@ -39,7 +36,7 @@ def test_status():
         
         # Parse and display status info
         try:
-            status_data = json.loads(response)
+            status_data = loads(data)
             print('\n=== DEVICE STATUS ===')
             print(f'Device ID: {status_data.get("deviceId", "N/A")}')
             print(f'Firmware Version: {status_data.get("firmwareVersion", "N/A")}')
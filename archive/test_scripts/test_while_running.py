@@ -4,8 +4,9 @@ Test device communication while server is running
 """
 
 import socket
-import json
-import uuid
+import secrets
+
+from _udp_util import status_command
 
 def send_test_command():
     """Send a command to the device while the server is running"""
@@ -16,18 +17,11 @@ def send_test_command():
     send_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     
     try:
-        command_id = str(uuid.uuid4())
-        command = {
-            'commandId': command_id,
-            'action': 'status',
-            'parameters': {}
-        }
-        
-        message = json.dumps(command)
-        print(f"Sending: {message}")
+        message = status_command(secrets.token_hex(8))
+        print(f"Sending: {message.decode('utf-8')}")
         
         # Send to device
-        send_socket.sendto(message.encode('utf-8'), ('192.168.1.48', 8888))
+        send_socket.sendto(message, ('192.168.1.48', 8888))
         print("Command sent successfully!")
         print("Check the web interface devices list and server console output.")
         
@@ -5,24 +5,51 @@ Generates simple test patterns as JPEG files for video testing
 """
 
 from PIL import Image, ImageDraw, ImageFont
+from concurrent.futures import ProcessPoolExecutor
+import functools
 import os
 import math
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to filling a byte buffer
+    np = None
+
+@functools.lru_cache(maxsize=8)
+def get_font(size):
+    """Load Arial at the given size once, falling back to PIL's default font"""
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+def gradient_background(width, height):
+    """Create the static pattern's RGB gradient in a single PIL call"""
+    if np is not None:
+        x = np.arange(width, dtype=np.float64)
+        y = np.arange(height, dtype=np.float64)[:, None]
+        r = np.broadcast_to(255 * (x / width), (height, width))
+        g = np.broadcast_to(255 * (y / height), (height, width))
+        b = 255 * ((x + y) / (width + height))
+        return Image.fromarray(np.dstack([r, g, b]).astype(np.uint8), 'RGB')
+    
+    buf = bytearray(width * height * 3)
+    i = 0
+    for y in range(height):
+        for x in range(width):
+            buf[i] = int(255 * (x / width))
+            buf[i + 1] = int(255 * (y / height))
+            buf[i + 2] = int(255 * ((x + y) / (width + height)))
+            i += 3
+    return Image.frombytes('RGB', (width, height), bytes(buf))
+
 def create_test_pattern(width=320, height=240):
     """Create a simple test pattern image"""
     
-    # Create image
-    img = Image.new('RGB', (width, height), 'black')
+    # Create image over a colorful gradient background
+    img = gradient_background(width, height)
     draw = ImageDraw.Draw(img)
     
-    # Draw colorful gradient background
-    for y in range(height):
-        for x in range(width):
-            r = int(255 * (x / width))
-            g = int(255 * (y / height))
-            b = int(255 * ((x + y) / (width + height)))
-            draw.point((x, y), (r, g, b))
-    
     # Draw test pattern elements
     # Corner markers
     corner_size = 20
@@ -37,154 +64,202 @@ def create_test_pattern(width=320, height=240):
     draw.line([center_x, center_y-20, center_x, center_y+20], fill='white', width=2)
     
     # Draw text
-    try:
-        # Try to use a font, fall back to default if not available
-        font = ImageFont.truetype("arial.ttf", 16)
-    except:
-        font = ImageFont.load_default()
+    font = get_font(16)
     
     draw.text((10, height-40), "TRICORDER TEST", fill='white', font=font)
     draw.text((10, height-25), f"{width}x{height}", fill='white', font=font)
     
     return img
 
+@functools.lru_cache(maxsize=4)
+def color_wheel_grids(width, height):
+    """Per-pixel (distance, angle) from center, shared by every animated frame"""
+    dx = np.arange(width) - width/2
+    dy = (np.arange(height) - height/2)[:, None]
+    return np.hypot(dx, dy), np.arctan2(dy, dx)
+
+def color_wheel_background(angle, width, height):
+    """Create the animated pattern's color wheel in a single PIL call"""
+    if np is not None:
+        distance, pixel_angle = color_wheel_grids(width, height)
+        
+        # Animated colors based on angle and time
+        phase = pixel_angle + angle
+        r = (127 + 127 * np.sin(phase)).astype(np.int32)
+        g = (127 + 127 * np.sin(phase + 2*math.pi/3)).astype(np.int32)
+        b = (127 + 127 * np.sin(phase + 4*math.pi/3)).astype(np.int32)
+        
+        # Add radial pattern
+        radial = (127 + 127 * np.sin(distance * 0.1 + angle * 3)).astype(np.int32)
+        pixels = (np.dstack([r, g, b]) + radial[:, :, None]) // 2
+        return Image.fromarray(pixels.astype(np.uint8), 'RGB')
+    
+    buf = bytearray(width * height * 3)
+    i = 0
+    for y in range(height):
+        for x in range(width):
+            dx = x - width/2
+            dy = y - height/2
+            distance = math.sqrt(dx*dx + dy*dy)
+            pixel_angle = math.atan2(dy, dx)
+            
+            r = int(127 + 127 * math.sin(pixel_angle + angle))
+            g = int(127 + 127 * math.sin(pixel_angle + angle + 2*math.pi/3))
+            b = int(127 + 127 * math.sin(pixel_angle + angle + 4*math.pi/3))
+            radial = int(127 + 127 * math.sin(distance * 0.1 + angle * 3))
+            
+            buf[i] = (r + radial) // 2
+            buf[i + 1] = (g + radial) // 2
+            buf[i + 2] = (b + radial) // 2
+            i += 3
+    return Image.frombytes('RGB', (width, height), bytes(buf))
+
+def create_animated_test_frame(frame, frames=30, width=320, height=240):
+    """Create one frame of the animated test pattern"""
+    
+    # Animated color wheel
+    angle = (frame / frames) * 2 * math.pi
+    
+    # Create base image
+    img = color_wheel_background(angle, width, height)
+    draw = ImageDraw.Draw(img)
+    
+    # Add frame counter
+    font = get_font(20)
+    
+    draw.text((10, 10), f"Frame {frame+1:02d}/{frames}", fill='white', font=font)
+    
+    # Add moving elements
+    circle_x = int(width/2 + 80 * math.cos(angle))
+    circle_y = int(height/2 + 60 * math.sin(angle))
+    draw.ellipse([circle_x-10, circle_y-10, circle_x+10, circle_y+10], fill='white')
+    
+    return img
+
 def create_animated_test_pattern(width=320, height=240, frames=30):
     """Create an animated test pattern sequence"""
+    return [create_animated_test_frame(frame, frames, width, height)
+            for frame in range(frames)]
+
+@functools.lru_cache(maxsize=1)
+def color_tile_canvas():
+    """Return one (image, draw) pair that color tiles are repainted onto"""
+    img = Image.new('RGB', (320, 240))
+    return img, ImageDraw.Draw(img)
+
+def create_color_tile(name, color, canvas=None):
+    """Create a solid color tile labelled with the color name
     
-    patterns = []
-    
-    for frame in range(frames):
-        # Create base image
-        img = Image.new('RGB', (width, height), 'black')
+    If a canvas from color_tile_canvas() is given it is repainted and
+    returned instead of allocating a new image.
+    """
+    if canvas is None:
+        img = Image.new('RGB', (320, 240), color)
         draw = ImageDraw.Draw(img)
-        
-        # Animated color wheel
-        angle = (frame / frames) * 2 * math.pi
-        
-        for y in range(height):
-            for x in range(width):
-                # Distance from center
-                dx = x - width/2
-                dy = y - height/2
-                distance = math.sqrt(dx*dx + dy*dy)
-                
-                # Angle from center
-                pixel_angle = math.atan2(dy, dx)
-                
-                # Animated colors based on angle and time
-                r = int(127 + 127 * math.sin(pixel_angle + angle))
-                g = int(127 + 127 * math.sin(pixel_angle + angle + 2*math.pi/3))
-                b = int(127 + 127 * math.sin(pixel_angle + angle + 4*math.pi/3))
-                
-                # Add radial pattern
-                radial = int(127 + 127 * math.sin(distance * 0.1 + angle * 3))
-                r = (r + radial) // 2
-                g = (g + radial) // 2
-                b = (b + radial) // 2
-                
-                draw.point((x, y), (r, g, b))
-        
-        # Add frame counter
-        try:
-            font = ImageFont.truetype("arial.ttf", 20)
-        except:
-            font = ImageFont.load_default()
-        
-        draw.text((10, 10), f"Frame {frame+1:02d}/{frames}", fill='white', font=font)
-        
-        # Add moving elements
-        circle_x = int(width/2 + 80 * math.cos(angle))
-        circle_y = int(height/2 + 60 * math.sin(angle))
-        draw.ellipse([circle_x-10, circle_y-10, circle_x+10, circle_y+10], fill='white')
-        
-        patterns.append(img)
+    else:
+        img, draw = canvas
+        img.paste(color, (0, 0, 320, 240))
+    
+    font = get_font(24)
+    
+    # Use contrasting text color
+    text_color = 'black' if sum(color) > 384 else 'white'
+    draw.text((120, 110), name.upper(), fill=text_color, font=font)
     
-    return patterns
+    return img
+
+def create_startup_frame(frame):
+    """Create one frame of the 20-frame startup animation"""
+    img = Image.new('RGB', (320, 240), 'black')
+    draw = ImageDraw.Draw(img)
+    
+    # Animated "TRICORDER" text
+    alpha = frame / 19.0
+    brightness = int(255 * alpha)
+    
+    font = get_font(32)
+    
+    # Fade in effect
+    color = (brightness, brightness, brightness)
+    draw.text((80, 100), "TRICORDER", fill=color, font=font)
+    
+    # Add scanning line
+    if frame > 10:
+        scan_y = int((frame - 10) * 24)
+        if scan_y < 240:
+            draw.line([0, scan_y, 320, scan_y], fill='cyan', width=2)
+    
+    return img
+
+OUTPUT_DIR = 'test_videos'
+
+def save_jpeg(img, path):
+    """Save img as a JPEG, naming the format so Pillow skips the extension lookup"""
+    img.save(path, 'JPEG', quality=85, optimize=False)
+
+# Worker entry points for the process pool; they live at module level so
+# they can be pickled.
+def _render_animated_frame(task):
+    frame, frames, path = task
+    save_jpeg(create_animated_test_frame(frame, frames), path)
+
+def _render_color_tile(task):
+    name, color, path = task
+    # Each worker process repaints its own canvas for every tile
+    save_jpeg(create_color_tile(name, color, color_tile_canvas()), path)
+
+def _render_startup_frame(task):
+    frame, path = task
+    save_jpeg(create_startup_frame(frame), path)
 
 def save_test_patterns():
     """Save various test patterns"""
     
     # Create output directory
-    os.makedirs('test_videos', exist_ok=True)
+    out = OUTPUT_DIR
+    os.makedirs(out, exist_ok=True)
     
     print("Generating test patterns...")
     
-    # Static test pattern
-    print("1. Creating static test pattern...")
-    static_pattern = create_test_pattern()
-    static_pattern.save('test_videos/static_test.jpg', 'JPEG', quality=85)
-    print("   Saved: test_videos/static_test.jpg")
-    
-    # Animated test pattern
-    print("2. Creating animated test pattern (30 frames)...")
-    animated_frames = create_animated_test_pattern(frames=30)
-    
-    # Save animated sequence as individual frames
-    for i, frame in enumerate(animated_frames):
-        filename = f'test_videos/animated_test_frame_{i+1:03d}.jpg'
-        frame.save(filename, 'JPEG', quality=85)
-    
-    print(f"   Saved: test_videos/animated_test_frame_001.jpg to animated_test_frame_030.jpg")
-    
-    # Create a simple color cycle
-    print("3. Creating color cycle pattern...")
-    colors = [
-        ('red', (255, 0, 0)),
-        ('green', (0, 255, 0)),
-        ('blue', (0, 0, 255)),
-        ('yellow', (255, 255, 0)),
-        ('cyan', (0, 255, 255)),
-        ('magenta', (255, 0, 255)),
-        ('white', (255, 255, 255))
-    ]
-    
-    for i, (name, color) in enumerate(colors):
-        img = Image.new('RGB', (320, 240), color)
-        draw = ImageDraw.Draw(img)
+    # Frames are independent, so render and encode them across processes
+    with ProcessPoolExecutor() as pool:
+        # Static test pattern
+        print("1. Creating static test pattern...")
+        static_pattern = create_test_pattern()
+        save_jpeg(static_pattern, f'{out}/static_test.jpg')
+        print(f"   Saved: {out}/static_test.jpg")
         
-        try:
-            font = ImageFont.truetype("arial.ttf", 24)
-        except:
-            font = ImageFont.load_default()
+        # Animated test pattern, saved as individual frames
+        print("2. Creating animated test pattern (30 frames)...")
+        frames = 30
+        paths = [f'{out}/animated_test_frame_{i+1:03d}.jpg' for i in range(frames)]
+        tasks = [(i, frames, path) for i, path in enumerate(paths)]
+        list(pool.map(_render_animated_frame, tasks, chunksize=4))
         
-        # Use contrasting text color
-        text_color = 'black' if sum(color) > 384 else 'white'
-        draw.text((120, 110), name.upper(), fill=text_color, font=font)
+        print(f"   Saved: {out}/animated_test_frame_001.jpg to animated_test_frame_030.jpg")
         
-        img.save(f'test_videos/color_{name}.jpg', 'JPEG', quality=85)
-    
-    print("   Saved: test_videos/color_*.jpg (7 colors)")
-    
-    # Create startup animation
-    print("4. Creating startup animation...")
-    startup_frames = []
-    
-    for frame in range(20):
-        img = Image.new('RGB', (320, 240), 'black')
-        draw = ImageDraw.Draw(img)
+        # Create a simple color cycle
+        print("3. Creating color cycle pattern...")
+        colors = [
+            ('red', (255, 0, 0)),
+            ('green', (0, 255, 0)),
+            ('blue', (0, 0, 255)),
+            ('yellow', (255, 255, 0)),
+            ('cyan', (0, 255, 255)),
+            ('magenta', (255, 0, 255)),
+            ('white', (255, 255, 255))
+        ]
+        tasks = [(name, color, f'{out}/color_{name}.jpg') for name, color in colors]
+        list(pool.map(_render_color_tile, tasks))
         
-        # Animated "TRICORDER" text
-        alpha = frame / 19.0
-        brightness = int(255 * alpha)
+        print(f"   Saved: {out}/color_*.jpg (7 colors)")
         
-        try:
-            font = ImageFont.truetype("arial.ttf", 32)
-        except:
-            font = ImageFont.load_default()
+        # Create startup animation
+        print("4. Creating startup animation...")
+        tasks = [(frame, f'{out}/startup_frame_{frame+1:03d}.jpg') for frame in range(20)]
+        list(pool.map(_render_startup_frame, tasks, chunksize=4))
         
-        # Fade in effect
-        color = (brightness, brightness, brightness)
-        draw.text((80, 100), "TRICORDER", fill=color, font=font)
-        
-        # Add scanning line
-        if frame > 10:
-            scan_y = int((frame - 10) * 24)
-            if scan_y < 240:
-                draw.line([0, scan_y, 320, scan_y], fill='cyan', width=2)
-        
-        img.save(f'test_videos/startup_frame_{frame+1:03d}.jpg', 'JPEG', quality=85)
-    
-    print("   Saved: test_videos/startup_frame_001.jpg to startup_frame_020.jpg")
+        print(f"   Saved: {out}/startup_frame_001.jpg to startup_frame_020.jpg")
     
     print("\nTest patterns generated successfully!")
     print("\nTo use these on your tricorder:")
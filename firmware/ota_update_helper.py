@@ -4,176 +4,307 @@ OTA Update Helper for Tricorder ESP32 Firmware
 Helps discover devices and provides OTA update instructions
 """
 
+import asyncio
+import itertools
+import os
 import socket
 import json
-import time
 import subprocess
 import platform
 import sys
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Set
+
+try:
+    import psutil
+except ImportError:  # psutil is optional; without it the fixed broadcast list is used
+    psutil = None
+
+try:
+    from orjson import loads  # Takes bytes directly, no decode step
+except ImportError:  # orjson is optional; fall back to the stdlib
+    def loads(data):
+        """Parse JSON from bytes, bytearray or memoryview"""
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+# Only the commandId changes, so the rest is encoded once. IDs are
+# <pid>_<counter>, unique across helper processes running side by side.
+_DISCOVERY_TEMPLATE = b'{"action":"discovery","commandId":"discovery_%d_%d"}'
+_OTA_INFO_TEMPLATE = b'{"action":"ota_info","commandId":"ota_info_%d_%d"}'
+_PID = os.getpid()
+_cmd_counter = itertools.count()
+
+_IS_WINDOWS = platform.system().lower() == "windows"
+# Single ping that waits at most one second for the reply. The wait flag's
+# unit differs: seconds on Linux, milliseconds on Windows, macOS and the BSDs.
+# Elsewhere the subprocess timeout bounds the wait instead.
+if _IS_WINDOWS:
+    _PING_CMD = ['ping', '-n', '1', '-w', '1000']
+elif sys.platform.startswith('linux'):
+    _PING_CMD = ['ping', '-c', '1', '-W', '1']
+elif sys.platform == 'darwin' or 'bsd' in sys.platform:
+    _PING_CMD = ['ping', '-c', '1', '-W', '1000']
+else:
+    _PING_CMD = ['ping', '-c', '1']
+
+RCVBUF_BYTES = 1 << 20  # Room for a burst of replies without kernel drops
+
+def set_rcvbuf(sock, size=RCVBUF_BYTES):
+    """Grow the socket receive buffer and warn if the kernel clamps it"""
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+    actual = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    if actual < size:  # Linux reports double the request when it is honoured
+        print(f"Warning: UDP receive buffer is {actual} bytes, wanted {size} "
+              f"(raise net.core.rmem_max)")
+
+# Used when the interface broadcast addresses can't be read
+FALLBACK_BROADCASTS = ['255.255.255.255', '192.168.1.255', '192.168.0.255', '10.0.0.255']
+
+def get_broadcast_addresses() -> List[str]:
+    """Return the broadcast address of each active IPv4 interface"""
+    if psutil is not None:
+        stats = psutil.net_if_stats()
+        broadcasts = {
+            snic.broadcast
+            for ifname, addrs in psutil.net_if_addrs().items()
+            if ifname in stats and stats[ifname].isup
+            for snic in addrs
+            if snic.family == socket.AF_INET and snic.broadcast
+        }
+        if broadcasts:
+            return sorted(broadcasts)
+    return FALLBACK_BROADCASTS
+
+# Instruction text is written in one go rather than line by line
+_PIO_TEMPLATE = """
+============================================================
+PlatformIO OTA Instructions for {device_id}
+============================================================
+Device IP: {device_ip}
+OTA Password: tricorder123
+
+Method 1: Upload via PlatformIO CLI
+----------------------------------------
+pio run --target upload --upload-port {device_ip}
+
+Method 2: Add to platformio.ini
+----------------------------------------
+[env:esp32_ota]
+platform = espressif32
+board = esp32dev
+framework = arduino
+upload_protocol = espota
+upload_port = {device_ip}
+upload_flags = --auth=tricorder123
+
+Then run: pio run -e esp32_ota --target upload
+
+Method 3: Arduino IDE
+----------------------------------------
+1. Go to Tools -> Port
+2. Select '{device_id} at {device_ip}'
+3. Upload normally (password will be prompted)
+4. Enter password: tricorder123
+
+"""
+
+_ARDUINO_TEMPLATE = """
+============================================================
+Arduino IDE OTA Instructions for {device_id}
+============================================================
+1. Make sure the device is powered on and connected to WiFi
+2. Open Arduino IDE
+3. Go to Tools -> Port
+4. Look for '{device_id} at {device_ip}' in the network ports section
+5. Select that port
+6. Click Upload
+7. When prompted, enter password: tricorder123
+8. Wait for upload to complete
+
+Note: If the device doesn't appear in network ports:
+- Check that both computer and ESP32 are on same network
+- Try restarting Arduino IDE
+- Verify the device IP is accessible via ping
+
+"""
+
+class DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Collects discovery replies as they arrive, keyed by device IP"""
+    
+    def __init__(self):
+        self.devices: Dict[str, Dict] = {}
+        self.new_device = asyncio.Event()  # Set whenever a device is added
+    
+    def datagram_received(self, data, addr):
+        try:
+            response = loads(data)
+        except json.JSONDecodeError:
+            return
+        
+        if not isinstance(response, dict) or response.get('type') != 'tricorder':
+            return
+        
+        # Avoid duplicates; the first reply from an address wins
+        ip = response.get('ipAddress', addr[0])
+        if ip in self.devices:
+            return
+        
+        device_info = {
+            'deviceId': response.get('deviceId', 'Unknown'),
+            'firmwareVersion': response.get('firmwareVersion', 'Unknown'),
+            'ipAddress': ip,
+            'actualIP': addr[0]  # IP we received response from
+        }
+        self.devices[ip] = device_info
+        self.new_device.set()
+        print(f"Found: {device_info['deviceId']} at {ip} (v{device_info['firmwareVersion']})")
+    
+    def error_received(self, exc):
+        print(f"Discovery socket error: {exc}")
+
+class OTAInfoProtocol(asyncio.DatagramProtocol):
+    """Resolves the pending ota_info request for whichever device replied"""
+    
+    def __init__(self):
+        self.pending: Dict[str, asyncio.Future] = {}
+    
+    def datagram_received(self, data, addr):
+        future = self.pending.get(addr[0])
+        if future is None or future.done():
+            return
+        try:
+            future.set_result(loads(data))
+        except json.JSONDecodeError as e:
+            future.set_exception(e)
 
 class TricorderOTAHelper:
     def __init__(self):
         self.discovered_devices = []
         
-    def discover_devices(self, timeout: int = 5) -> List[Dict]:
-        """Discover Tricorder devices on the network"""
-        print("Discovering Tricorder devices...")
+    def discover_devices(self, timeout: int = 5, expected: Optional[int] = None,
+                         quiet_period: Optional[float] = None) -> List[Dict]:
+        """Discover Tricorder devices on the network
         
-        # Create UDP socket for discovery
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        sock.settimeout(1)
+        Listening stops early once `expected` devices have replied, or once
+        no new device has replied for `quiet_period` seconds.
+        """
+        print("Discovering Tricorder devices...")
         
-        # Send discovery broadcast
-        discovery_msg = {
-            "action": "discovery",
-            "commandId": f"discovery_{int(time.time())}"
-        }
+        devices = asyncio.run(self._discover(timeout, expected, quiet_period))
         
-        message = json.dumps(discovery_msg).encode()
+        self.discovered_devices = list(devices.values())
+        print(f"\nDiscovered {len(devices)} Tricorder device(s)")
+        return self.discovered_devices
+    
+    async def _discover(self, timeout: float, expected: Optional[int],
+                        quiet_period: Optional[float]) -> Dict[str, Dict]:
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.create_datagram_endpoint(
+            DiscoveryProtocol, family=socket.AF_INET, allow_broadcast=True)
+        set_rcvbuf(transport.get_extra_info('socket'))
         
         try:
-            # Broadcast to common networks
-            broadcast_addresses = [
-                ('255.255.255.255', 8888),
-                ('192.168.1.255', 8888),
-                ('192.168.0.255', 8888),
-                ('10.0.0.255', 8888)
-            ]
+            # Broadcast on each local network; the limited broadcast is only
+            # needed when the interfaces can't be enumerated. Replies are
+            # handled by the protocol as they arrive, even mid-send.
+            message = _DISCOVERY_TEMPLATE % (_PID, next(_cmd_counter))
+            for ip in get_broadcast_addresses():
+                transport.sendto(message, (ip, 8888))
             
-            for addr in broadcast_addresses:
-                try:
-                    sock.sendto(message, addr)
-                except Exception as e:
-                    print(f"Failed to send to {addr}: {e}")
-            
-            # Listen for responses
-            devices = []
-            start_time = time.time()
-            
-            while time.time() - start_time < timeout:
-                try:
-                    data, addr = sock.recvfrom(1024)
-                    response = json.loads(data.decode())
-                    
-                    if response.get('type') == 'tricorder':
-                        device_info = {
-                            'deviceId': response.get('deviceId', 'Unknown'),
-                            'firmwareVersion': response.get('firmwareVersion', 'Unknown'),
-                            'ipAddress': response.get('ipAddress', addr[0]),
-                            'actualIP': addr[0]  # IP we received response from
-                        }
-                        
-                        # Avoid duplicates
-                        if not any(d['ipAddress'] == device_info['ipAddress'] for d in devices):
-                            devices.append(device_info)
-                            print(f"Found: {device_info['deviceId']} at {device_info['ipAddress']} (v{device_info['firmwareVersion']})")
+            deadline = loop.time() + timeout
+            while not (expected and len(protocol.devices) >= expected):
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                if quiet_period and protocol.devices:
+                    remaining = min(remaining, quiet_period)
                 
-                except socket.timeout:
-                    continue
-                except json.JSONDecodeError:
-                    continue
-                except Exception as e:
-                    print(f"Error processing response: {e}")
-                    continue
-        
+                protocol.new_device.clear()
+                try:
+                    await asyncio.wait_for(protocol.new_device.wait(), remaining)
+                except asyncio.TimeoutError:
+                    if quiet_period and protocol.devices:
+                        break
         finally:
-            sock.close()
+            transport.close()
         
-        self.discovered_devices = devices
-        print(f"\nDiscovered {len(devices)} Tricorder device(s)")
-        return devices
+        return protocol.devices
     
-    def get_ota_info(self, ip_address: str) -> Optional[Dict]:
+    def get_ota_info(self, ip_address: str, timeout: float = 3) -> Optional[Dict]:
         """Get OTA information from a specific device"""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.settimeout(3)
+        return self.get_ota_info_many([ip_address], timeout)[ip_address]
+    
+    def get_ota_info_many(self, ip_addresses: List[str], timeout: float = 3) -> Dict[str, Optional[Dict]]:
+        """Get OTA information from several devices at once, keyed by IP"""
+        return asyncio.run(self._get_ota_info_many(ip_addresses, timeout))
+    
+    async def _get_ota_info_many(self, ip_addresses: List[str], timeout: float) -> Dict[str, Optional[Dict]]:
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.create_datagram_endpoint(
+            OTAInfoProtocol, family=socket.AF_INET)
         
         try:
-            ota_msg = {
-                "action": "ota_info",
-                "commandId": f"ota_info_{int(time.time())}"
-            }
-            
-            message = json.dumps(ota_msg).encode()
-            sock.sendto(message, (ip_address, 8888))
-            
-            data, addr = sock.recvfrom(1024)
-            response = json.loads(data.decode())
-            return response
-            
-        except Exception as e:
+            # Every request goes out before any reply is awaited, so the
+            # whole batch costs about one round trip
+            results = await asyncio.gather(
+                *(self._ota_info_one(transport, protocol, ip, timeout) for ip in ip_addresses))
+        finally:
+            transport.close()
+        
+        return dict(zip(ip_addresses, results))
+    
+    async def _ota_info_one(self, transport, protocol, ip_address: str, timeout: float) -> Optional[Dict]:
+        future = asyncio.get_running_loop().create_future()
+        protocol.pending[ip_address] = future
+        try:
+            transport.sendto(_OTA_INFO_TEMPLATE % (_PID, next(_cmd_counter)), (ip_address, 8888))
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            print(f"Failed to get OTA info from {ip_address}: timed out")
+            return None
+        except json.JSONDecodeError as e:
             print(f"Failed to get OTA info from {ip_address}: {e}")
             return None
         finally:
-            sock.close()
+            protocol.pending.pop(ip_address, None)
     
     def show_platformio_instructions(self, device_ip: str, device_id: str):
         """Show PlatformIO OTA upload instructions"""
-        print(f"\n{'='*60}")
-        print(f"PlatformIO OTA Instructions for {device_id}")
-        print(f"{'='*60}")
-        print(f"Device IP: {device_ip}")
-        print(f"OTA Password: tricorder123")
-        print()
-        print("Method 1: Upload via PlatformIO CLI")
-        print("-" * 40)
-        print(f"pio run --target upload --upload-port {device_ip}")
-        print()
-        print("Method 2: Add to platformio.ini")
-        print("-" * 40)
-        print("[env:esp32_ota]")
-        print("platform = espressif32")
-        print("board = esp32dev")
-        print("framework = arduino")
-        print(f"upload_protocol = espota")
-        print(f"upload_port = {device_ip}")
-        print(f"upload_flags = --auth=tricorder123")
-        print()
-        print("Then run: pio run -e esp32_ota --target upload")
-        print()
-        print("Method 3: Arduino IDE")
-        print("-" * 40)
-        print("1. Go to Tools -> Port")
-        print(f"2. Select '{device_id} at {device_ip}'")
-        print("3. Upload normally (password will be prompted)")
-        print("4. Enter password: tricorder123")
-        print()
+        sys.stdout.write(_PIO_TEMPLATE.format(device_id=device_id, device_ip=device_ip))
         
     def show_arduino_ide_instructions(self, device_ip: str, device_id: str):
         """Show Arduino IDE OTA instructions"""
-        print(f"\n{'='*60}")
-        print(f"Arduino IDE OTA Instructions for {device_id}")
-        print(f"{'='*60}")
-        print("1. Make sure the device is powered on and connected to WiFi")
-        print("2. Open Arduino IDE")
-        print("3. Go to Tools -> Port")
-        print(f"4. Look for '{device_id} at {device_ip}' in the network ports section")
-        print("5. Select that port")
-        print("6. Click Upload")
-        print("7. When prompted, enter password: tricorder123")
-        print("8. Wait for upload to complete")
-        print()
-        print("Note: If the device doesn't appear in network ports:")
-        print("- Check that both computer and ESP32 are on same network")
-        print("- Try restarting Arduino IDE")
-        print("- Verify the device IP is accessible via ping")
-        print()
+        sys.stdout.write(_ARDUINO_TEMPLATE.format(device_id=device_id, device_ip=device_ip))
 
     def ping_device(self, ip_address: str) -> bool:
         """Ping a device to check connectivity"""
         try:
-            if platform.system().lower() == "windows":
-                result = subprocess.run(['ping', '-n', '1', ip_address], 
-                                      capture_output=True, timeout=5)
-            else:
-                result = subprocess.run(['ping', '-c', '1', ip_address], 
-                                      capture_output=True, timeout=5)
+            result = subprocess.run([*_PING_CMD, ip_address], capture_output=True, timeout=5)
             return result.returncode == 0
         except Exception:
             return False
 
+    def ping_many(self, ip_addresses: List[str]) -> Set[str]:
+        """Ping several devices and return the set of reachable IPs"""
+        if not ip_addresses:
+            return set()
+        
+        # fping sweeps every host from one process and lists the ones that answered.
+        # It exits 0 when all hosts answered and 1 when some didn't; anything
+        # else (bad address, no permission) means its output can't be trusted
+        try:
+            result = subprocess.run(['fping', '-a', '-q', '-t', '500', *ip_addresses],
+                                    capture_output=True, timeout=5)
+            if result.returncode in (0, 1):
+                return set(result.stdout.decode().split())
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        
+        # No usable fping: pings spend their time waiting on the network, so run them all at once
+        with ThreadPoolExecutor(max_workers=min(32, len(ip_addresses))) as pool:
+            results = pool.map(self.ping_device, ip_addresses)
+            return {ip for ip, reachable in zip(ip_addresses, results) if reachable}
+
     def run_interactive(self):
         """Run interactive OTA helper"""
         print("Tricorder OTA Update Helper")
@@ -231,10 +362,11 @@ class TricorderOTAHelper:
                     continue
                     
                 print("\nTesting connectivity to discovered devices...")
+                reachable = self.ping_many([d['ipAddress'] for d in self.discovered_devices])
+                
                 for device in self.discovered_devices:
-                    ip = device['ipAddress']
-                    print(f"Pinging {device['deviceId']} at {ip}...", end=" ")
-                    if self.ping_device(ip):
+                    print(f"Pinging {device['deviceId']} at {device['ipAddress']}...", end=" ")
+                    if device['ipAddress'] in reachable:
                         print("✓ Reachable")
                     else:
                         print("✗ Not reachable")
@@ -248,23 +380,33 @@ class TricorderOTAHelper:
                 for i, device in enumerate(self.discovered_devices):
                     print(f"{i+1}. {device['deviceId']} at {device['ipAddress']}")
                 
-                try:
-                    device_num = int(input("Select device number: ")) - 1
-                    if 0 <= device_num < len(self.discovered_devices):
-                        device = self.discovered_devices[device_num]
-                        print(f"\nGetting OTA info from {device['deviceId']}...")
-                        
-                        ota_info = self.get_ota_info(device['ipAddress'])
-                        if ota_info:
-                            print(f"OTA Status: {'Enabled' if ota_info.get('otaEnabled') else 'Disabled'}")
-                            print(f"Hostname: {ota_info.get('hostname', 'Unknown')}")
-                            print(f"Message: {ota_info.get('result', 'No message')}")
-                        else:
-                            print("Failed to get OTA info")
-                    else:
+                selection = input("Select device number (or 'a' for all): ").strip().lower()
+                if selection == 'a':
+                    devices = self.discovered_devices
+                else:
+                    try:
+                        device_num = int(selection) - 1
+                    except ValueError:
+                        print("Invalid input")
+                        continue
+                    if not 0 <= device_num < len(self.discovered_devices):
                         print("Invalid device number")
-                except ValueError:
-                    print("Invalid input")
+                        continue
+                    devices = [self.discovered_devices[device_num]]
+                
+                print(f"\nGetting OTA info from {', '.join(d['deviceId'] for d in devices)}...")
+                results = self.get_ota_info_many([d['ipAddress'] for d in devices])
+                
+                for device in devices:
+                    ota_info = results[device['ipAddress']]
+                    if len(devices) > 1:
+                        print(f"\n{device['deviceId']}:")
+                    if ota_info:
+                        print(f"OTA Status: {'Enabled' if ota_info.get('otaEnabled') else 'Disabled'}")
+                        print(f"Hostname: {ota_info.get('hostname', 'Unknown')}")
+                        print(f"Message: {ota_info.get('result', 'No message')}")
+                    else:
+                        print("Failed to get OTA info")
                     
             elif choice == '5':
                 print("Goodbye!")
@@ -277,8 +419,14 @@ if __name__ == "__main__":
     helper = TricorderOTAHelper()
     
     if len(sys.argv) > 1 and sys.argv[1] == "--discover":
-        # Quick discovery mode
-        devices = helper.discover_devices()
+        # Quick discovery mode; an optional device count ends the scan as soon as they all reply
+        expected = None
+        if len(sys.argv) > 2:
+            if not sys.argv[2].isdigit() or int(sys.argv[2]) < 1:
+                print(f"Usage: {sys.argv[0]} --discover [device_count]")
+                sys.exit(2)
+            expected = int(sys.argv[2])
+        devices = helper.discover_devices(expected=expected)
         if devices:
             print(f"\nFound {len(devices)} device(s):")
             for device in devices:
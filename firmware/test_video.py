@@ -4,26 +4,98 @@ Tricorder Video Test Script
 Tests video playback functionality via UDP commands
 """
 
+import cmd
+import shlex
 import socket
 import json
 import time
 import sys
+import subprocess
+import platform
+
+try:
+    import orjson
+    dumps = orjson.dumps  # Already returns bytes
+    loads = orjson.loads  # Takes bytes directly, no decode step
+except ImportError:  # orjson is optional; fall back to the stdlib
+    def dumps(obj):
+        """Serialize obj to UTF-8 JSON bytes"""
+        return json.dumps(obj).encode()
+
+    def loads(data):
+        """Parse JSON from bytes, bytearray or memoryview"""
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
 
 # Configuration
 TRICORDER_IP = "192.168.1.100"  # Update with your tricorder's IP
 UDP_PORT = 8888
 TIMEOUT = 5.0
 
+_PING_COUNT_FLAG = "-n" if platform.system().lower() == "windows" else "-c"
+
+RCVBUF_BYTES = 1 << 20  # Room for a burst of replies without kernel drops
+
+def set_rcvbuf(sock, size=RCVBUF_BYTES):
+    """Grow the socket receive buffer and warn if the kernel clamps it"""
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+    actual = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    if actual < size:  # Linux reports double the request when it is honoured
+        print(f"Warning: UDP receive buffer is {actual} bytes, wanted {size} "
+              f"(raise net.core.rmem_max)")
+
+# Commands all go to one device, so a single connected socket is reused
+_sock = None
+# Replies are read into this buffer instead of a new bytes object each time
+_rx_buf = bytearray(4096)
+_rx_view = memoryview(_rx_buf)
+
+def get_socket():
+    """Return the UDP socket connected to the tricorder, creating it on first use"""
+    global _sock
+    if _sock is None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        set_rcvbuf(sock)
+        sock.settimeout(TIMEOUT)
+        try:
+            sock.connect((TRICORDER_IP, UDP_PORT))
+        except OSError:
+            sock.close()
+            raise
+        _sock = sock
+    return _sock
+
+def discard_pending(sock):
+    """Drop replies still queued from earlier commands that timed out"""
+    sock.setblocking(False)
+    try:
+        while True:
+            sock.recv_into(_rx_buf)
+    except (BlockingIOError, ConnectionRefusedError):
+        # A refusal here is a stale ICMP error left by an earlier send
+        pass
+    finally:
+        sock.settimeout(TIMEOUT)
+
+def reply_matches(reply, command_id):
+    """True unless the reply echoes a different commandId than the one sent"""
+    if command_id is None or not isinstance(reply, dict):
+        return True
+    reply_id = reply.get('commandId', reply.get('command_id'))
+    return reply_id is None or reply_id == command_id
+
+def close_socket():
+    """Close the cached socket; the next command opens a new one"""
+    global _sock
+    if _sock is not None:
+        _sock.close()
+        _sock = None
+
 def test_connection():
     """Test basic network connectivity to the tricorder"""
-    import subprocess
-    import platform
-    
     print(f"Testing connection to {TRICORDER_IP}...")
     
     # Use ping to test basic connectivity
-    param = "-n" if platform.system().lower() == "windows" else "-c"
-    command = ["ping", param, "2", TRICORDER_IP]
+    command = ["ping", _PING_COUNT_FLAG, "2", TRICORDER_IP]
     
     try:
         result = subprocess.run(command, capture_output=True, text=True, timeout=10)
@@ -44,26 +116,35 @@ def test_connection():
 def send_command(command_data, wait_for_response=True):
     """Send a UDP command to the tricorder and optionally wait for response"""
     
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.settimeout(TIMEOUT)
-    
     try:
+        sock = get_socket()
+        discard_pending(sock)
+        
         # Send command
-        command_json = json.dumps(command_data)
-        print(f"Sending: {command_json}")
+        command_json = dumps(command_data)
+        print(f"Sending: {command_json.decode('utf-8')}")
         
-        sock.sendto(command_json.encode('utf-8'), (TRICORDER_IP, UDP_PORT))
+        sock.send(command_json)
         
         if wait_for_response:
-            # Wait for response - increased buffer size for large video lists
-            response, addr = sock.recvfrom(4096)  # Increased from 1024 to 4096 bytes
-            response_data = json.loads(response.decode('utf-8'))
+            # Wait for response - increased buffer size for large video lists;
+            # skip late replies that belong to an earlier command
+            command_id = command_data.get('commandId')
+            deadline = time.monotonic() + TIMEOUT
+            while True:
+                sock.settimeout(max(deadline - time.monotonic(), 0.001))
+                nbytes = sock.recv_into(_rx_buf)  # 4096 bytes, enough for large video lists
+                response_data = loads(_rx_view[:nbytes])
+                if reply_matches(response_data, command_id):
+                    break
+            sock.settimeout(TIMEOUT)
             print(f"Response: {json.dumps(response_data, indent=2)}")
             return response_data
         
         return None
         
     except socket.timeout:
+        close_socket()  # start the next command on a fresh socket
         print("Timeout waiting for response")
         print("Troubleshooting tips:")
         print("1. Check that the tricorder is powered on and connected to WiFi")
@@ -76,13 +157,12 @@ def send_command(command_data, wait_for_response=True):
         print("Check that the IP address format is correct (e.g., 192.168.1.48)")
         return None
     except ConnectionRefusedError:
+        close_socket()  # don't let the ICMP error surface on the next command
         print("Connection refused - device may not be listening on UDP port 8888")
         return None
     except Exception as e:
         print(f"Error: {e}")
         return None
-    finally:
-        sock.close()
 
 def test_video_commands():
     """Test various video-related commands"""
@@ -194,91 +274,122 @@ def test_video_commands():
     print()
     print("=== Test Complete ===")
 
-def interactive_mode():
-    """Interactive command mode"""
-    print("=== Interactive Mode ===")
-    print("Available commands:")
-    print("  status - Get device status")
-    print("  list - List available videos")
-    print("  play <video_name> - Play video (use base name without _001 etc.)")
-    print("  stop - Stop current video")
-    print("  led <r> <g> <b> - Set LED color")
-    print("  quit - Exit")
-    print()
-    print("Example video names:")
-    print("  play static_test")
-    print("  play color_red") 
-    print("  play startup")
-    print("  play animated_test")
-    print()
+class InteractiveShell(cmd.Cmd):
+    """Interactive command mode with readline history and tab completion"""
+    
+    intro = """=== Interactive Mode ===
+Available commands:
+  status - Get device status
+  list - List available videos
+  play <video_name> - Play video (use base name without _001 etc.)
+  stop - Stop current video
+  led <r> <g> <b> - Set LED color
+  quit - Exit
+
+Example video names:
+  play static_test
+  play color_red
+  play startup
+  play animated_test
+"""
+    prompt = "Command: "
     
-    command_id = 1
+    def __init__(self):
+        super().__init__()
+        self.command_id = 1
     
-    while True:
+    def next_command_id(self):
+        command_id = f"interactive_{self.command_id}"
+        self.command_id += 1
+        return command_id
+    
+    def do_status(self, arg):
+        """status - Get device status"""
+        send_command({
+            "action": "status",
+            "commandId": self.next_command_id()
+        })
+    
+    def do_list(self, arg):
+        """list - List available videos"""
+        send_command({
+            "action": "list_videos",
+            "commandId": self.next_command_id()
+        })
+    
+    def do_play(self, arg):
+        """play <video_name> - Play video (use base name without _001 etc.)"""
         try:
-            user_input = input("Command: ").strip()
-            
-            if not user_input:
-                continue
-                
-            if user_input == "quit":
-                break
-                
-            parts = user_input.split()
-            cmd = parts[0].lower()
-            
-            if cmd == "status":
-                send_command({
-                    "action": "status",
-                    "commandId": f"interactive_{command_id}"
-                })
-                
-            elif cmd == "list":
-                send_command({
-                    "action": "list_videos",
-                    "commandId": f"interactive_{command_id}"
-                })
-                
-            elif cmd == "play" and len(parts) > 1:
-                video_name = parts[1]
-                loop = input("Loop video? (Y/n): ").strip().lower() != 'n'
-                send_command({
-                    "action": "play_video",
-                    "commandId": f"interactive_{command_id}",
-                    "parameters": {
-                        "filename": video_name,  # Use base name, firmware will find the file
-                        "loop": loop
-                    }
-                })
-                
-            elif cmd == "stop":
-                send_command({
-                    "action": "stop_video",
-                    "commandId": f"interactive_{command_id}"
-                })
-                
-            elif cmd == "led" and len(parts) == 4:
-                try:
-                    r, g, b = int(parts[1]), int(parts[2]), int(parts[3])
-                    send_command({
-                        "action": "set_led_color",
-                        "commandId": f"interactive_{command_id}",
-                        "parameters": {"r": r, "g": g, "b": b}
-                    })
-                except ValueError:
-                    print("Invalid color values. Use numbers 0-255.")
-                    
-            else:
-                print("Unknown command. Type 'quit' to exit.")
-                print("Available: status, list, play <name>, stop, led <r> <g> <b>, quit")
-            
-            command_id += 1
-            
-        except KeyboardInterrupt:
-            print("\nExiting...")
-            break
-        except Exception as e:
-            print(f"Error: {e}")
+            args = shlex.split(arg)
+        except ValueError:  # unbalanced quote, e.g. an apostrophe in the name
+            args = []
+        if not args:
+            print("Usage: play <video_name>")
+            return
+        loop = input("Loop video? (Y/n): ").strip().lower() != 'n'
+        send_command({
+            "action": "play_video",
+            "commandId": self.next_command_id(),
+            "parameters": {
+                "filename": args[0],  # Use base name, firmware will find the file
+                "loop": loop
+            }
+        })
+    
+    def do_stop(self, arg):
+        """stop - Stop current video"""
+        send_command({
+            "action": "stop_video",
+            "commandId": self.next_command_id()
+        })
+    
+    def do_led(self, arg):
+        """led <r> <g> <b> - Set LED color"""
+        try:
+            args = shlex.split(arg)
+        except ValueError:  # unbalanced quote
+            args = []
+        if len(args) != 3:
+            print("Usage: led <r> <g> <b>")
+            return
+        try:
+            r, g, b = (int(value) for value in args)
+        except ValueError:
+            print("Invalid color values. Use numbers 0-255.")
+            return
+        send_command({
+            "action": "set_led_color",
+            "commandId": self.next_command_id(),
+            "parameters": {"r": r, "g": g, "b": b}
+        })
+    
+    def do_quit(self, arg):
+        """quit - Exit"""
+        return True
+    
+    do_EOF = do_quit
+    
+    def precmd(self, line):
+        # Command names are case-insensitive; arguments such as filenames are not
+        if line == 'EOF':
+            return line
+        name, sep, rest = line.strip().partition(' ')
+        return name.lower() + sep + rest
+    
+    def emptyline(self):
+        # Don't repeat the last command on a blank line
+        pass
+    
+    def default(self, line):
+        print("Unknown command. Type 'quit' to exit.")
+        print("Available: status, list, play <name>, stop, led <r> <g> <b>, quit")
+
+def interactive_mode():
+    """Interactive command mode"""
+    try:
+        InteractiveShell().cmdloop()
+    except KeyboardInterrupt:
+        print("\nExiting...")
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
@@ -288,7 +399,10 @@ if __name__ == "__main__":
     
     mode = input("Run (t)est or (i)nteractive mode? (t/i): ").strip().lower()
     
-    if mode == 'i':
-        interactive_mode()
-    else:
-        test_video_commands()
+    try:
+        if mode == 'i':
+            interactive_mode()
+        else:
+            test_video_commands()
+    finally:
+        close_socket()
@@ -4,18 +4,42 @@ Enhanced SACN Controller with Persistent Prop Configuration
 Manages individual prop configurations and SACN addressing automatically
 """
 
+import ipaddress
 import json
+import os
+import queue
+import select
 import socket
 import struct
+import sys
 import threading
 import time
 import requests
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Optional, Tuple, Callable
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 import sqlite3
 from pathlib import Path
 
-@dataclass
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    json_loads = json.loads  # also accepts bytes
+    
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+try:
+    from zeroconf import IPVersion, ServiceBrowser, ServiceStateChange, Zeroconf
+except ImportError:
+    Zeroconf = None
+
+# Slotted dataclasses need Python 3.10; older interpreters get a plain one
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class PropDevice:
     """Enhanced device representation with persistent configuration"""
     device_id: str
@@ -36,6 +60,29 @@ class PropDevice:
     
     # Runtime state
     last_led_values: Optional[List[Tuple[int, int, int]]] = None
+    
+    def config_key(self) -> tuple:
+        """Fields that are persisted and worth a database write when they change"""
+        return (
+            self.device_label, self.ip_address, self.device_type, self.sacn_universe,
+            self.dmx_start_address, self.num_leds, self.brightness, self.firmware_version
+        )
+    
+    def to_status_dict(self) -> dict:
+        """Flat status view; leaves out runtime-only state like last_led_values"""
+        return {
+            "device_id": self.device_id,
+            "device_label": self.device_label,
+            "ip_address": self.ip_address,
+            "device_type": self.device_type,
+            "sacn_universe": self.sacn_universe,
+            "dmx_start_address": self.dmx_start_address,
+            "num_leds": self.num_leds,
+            "brightness": self.brightness,
+            "last_seen": self.last_seen,
+            "online": self.online,
+            "firmware_version": self.firmware_version,
+        }
 
 class PropConfigManager:
     """Manages prop configurations and database synchronization"""
@@ -43,11 +90,94 @@ class PropConfigManager:
     def __init__(self, db_path: str = "props.db"):
         self.db_path = db_path
         self.props: Dict[str, PropDevice] = {}
+        # Lookup indexes over self.props; keep them in step via _store_prop()
+        self._by_label: Dict[str, PropDevice] = {}
+        self._by_universe: Dict[int, List[PropDevice]] = defaultdict(list)
+        self._index_lock = threading.Lock()
+        # Pooled keep-alive connections shared by the parallel discovery probes
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=32, pool_maxsize=64))
+        # One long-lived connection per thread, tracked so shutdown() can close them
+        self._tls = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        # get_status_summary() result, rebuilt only after props change
+        self._summary_cache: Optional[dict] = None
+        self._summary_dirty = True
         self.init_database()
+        # Write-behind: save_prop_to_db() only queues, and one writer thread
+        # commits whatever has queued up about once a second. The writer moves
+        # queued props into _unsaved (one entry per device) before touching
+        # the database, so the bound only applies backpressure to bursts
+        self._write_queue: "queue.Queue[PropDevice]" = queue.Queue(maxsize=1024)
+        self._unsaved: Dict[str, PropDevice] = {}
+        self._writer_stop = threading.Event()
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+    
+    def _index(self, prop: PropDevice):
+        self._by_label[prop.device_label] = prop
+        self._by_universe[prop.sacn_universe].append(prop)
+    
+    def _unindex(self, prop: PropDevice):
+        if self._by_label.get(prop.device_label) is prop:
+            del self._by_label[prop.device_label]
+        universe_props = self._by_universe.get(prop.sacn_universe, [])
+        # Match by identity; dataclass equality would hit identical copies
+        for i, indexed in enumerate(universe_props):
+            if indexed is prop:
+                del universe_props[i]
+                break
+        if not universe_props:
+            self._by_universe.pop(prop.sacn_universe, None)
+    
+    def _store_prop(self, prop: PropDevice):
+        """Add or replace a prop in self.props and the lookup indexes"""
+        with self._index_lock:
+            old = self.props.get(prop.device_id)
+            if old is not None:
+                self._unindex(old)
+            self.props[prop.device_id] = prop
+            self._index(prop)
+        self._summary_dirty = True
+    
+    def _get_conn(self) -> sqlite3.Connection:
+        """Return this thread's database connection, opening it on first use"""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is not None:
+            return conn
+        
+        # Autocommit mode; multi-statement writes open their own transaction
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        # WAL lets readers run alongside the discovery writer, and NORMAL
+        # sync only fsyncs at checkpoints instead of on every commit
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # The props table is tiny; map it and give it a cache big enough to
+        # keep every page resident so reads skip the pread path
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-8192")
+        self._tls.conn = conn
+        with self._conns_lock:
+            self._conns.append(conn)
+        return conn
+    
+    def shutdown(self):
+        """Flush queued writes, then close every database connection and the HTTP session"""
+        self._writer_stop.set()
+        self._writer_thread.join()
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._tls = threading.local()
+        self.session.close()
     
     def init_database(self):
         """Initialize SQLite database for prop configuration tracking"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_conn()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -73,15 +203,35 @@ class PropConfigManager:
         cursor.execute('''
             CREATE INDEX IF NOT EXISTS idx_universe_address ON props(sacn_universe, dmx_start_address);
         ''')
-        
-        conn.commit()
-        conn.close()
     
     def discover_prop(self, ip_address: str) -> Optional[PropDevice]:
         """Discover a prop and load its stored configuration"""
+        prop = self.fetch_prop(ip_address)
+        if prop is None:
+            return None
+        
+        # Update database
+        if self.refresh_prop(prop):
+            self.save_prop_to_db(prop)
+        return self.props[prop.device_id]
+    
+    def fetch_prop(self, ip_address: str) -> Optional[PropDevice]:
+        """Request a prop's configuration without touching local state"""
+        # Cheap TCP connect first so dead addresses cost 200 ms, not a full
+        # HTTP timeout; only live hosts get the real request
+        probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        probe.settimeout(0.2)
+        try:
+            if probe.connect_ex((ip_address, 80)) != 0:
+                return None
+        except OSError:
+            return None
+        finally:
+            probe.close()
+        
         try:
-            # Request configuration from prop
-            response = requests.get(f"http://{ip_address}/api/config", timeout=5)
+            # Request configuration from prop; most scanned addresses never answer
+            response = self.session.get(f"http://{ip_address}/api/config", timeout=1)
             if response.status_code == 200:
                 config_data = response.json()
                 
@@ -99,13 +249,6 @@ class PropConfigManager:
                     online=True
                 )
                 
-                # Update database
-                self.save_prop_to_db(prop)
-                self.props[prop.device_id] = prop
-                
-                print(f"Discovered prop: {prop.device_label} ({prop.device_id}) at {ip_address}")
-                print(f"  Universe: {prop.sacn_universe}, DMX: {prop.dmx_start_address}-{prop.dmx_start_address + prop.num_leds * 3 - 1}")
-                
                 return prop
                 
         except Exception as e:
@@ -113,28 +256,96 @@ class PropConfigManager:
         
         return None
     
-    def save_prop_to_db(self, prop: PropDevice):
-        """Save prop configuration to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def refresh_prop(self, prop: PropDevice) -> bool:
+        """Merge a freshly fetched prop into memory
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO props 
-            (device_id, device_label, ip_address, device_type, sacn_universe, 
-             dmx_start_address, num_leds, brightness, last_seen, firmware_version, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, julianday('now'))
-        ''', (
+        Returns True if the prop is new or its configuration changed and so
+        needs saving; an unchanged prop only has its liveness updated.
+        """
+        with self._index_lock:
+            old = self.props.get(prop.device_id)
+            if old is not None and old.config_key() == prop.config_key():
+                old.last_seen = prop.last_seen
+                old.online = True
+                self._summary_dirty = True
+                return False
+        
+        self._store_prop(prop)
+        print(f"Discovered prop: {prop.device_label} ({prop.device_id}) at {prop.ip_address}")
+        print(f"  Universe: {prop.sacn_universe}, DMX: {prop.dmx_start_address}-{prop.dmx_start_address + prop.num_leds * 3 - 1}")
+        return True
+    
+    _INSERT_SQL = '''
+        INSERT OR REPLACE INTO props 
+        (device_id, device_label, ip_address, device_type, sacn_universe, 
+         dmx_start_address, num_leds, brightness, last_seen, firmware_version, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, julianday('now'))
+    '''
+    
+    @staticmethod
+    def _prop_row(prop: PropDevice) -> tuple:
+        return (
             prop.device_id, prop.device_label, prop.ip_address, prop.device_type,
             prop.sacn_universe, prop.dmx_start_address, prop.num_leds, 
             prop.brightness, prop.last_seen, prop.firmware_version
-        ))
+        )
+    
+    def save_props_bulk(self, props: List[PropDevice]):
+        """Save many props with one executemany in a single transaction"""
+        if not props:
+            return
         
-        conn.commit()
-        conn.close()
+        self._summary_dirty = True
+        rows = [self._prop_row(prop) for prop in props]
+        conn = self._get_conn()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(self._INSERT_SQL, rows)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def save_prop_to_db(self, prop: PropDevice):
+        """Queue prop configuration for the background database writer"""
+        self._summary_dirty = True
+        self._write_queue.put(prop)
+    
+    def _drain_writes(self) -> bool:
+        """Commit everything queued so far, one row per prop.
+        
+        A failed batch stays in _unsaved and is retried on the next tick,
+        with newer queued values replacing older ones. Returns True once
+        nothing is left unsaved.
+        """
+        pending = self._unsaved
+        while True:
+            try:
+                prop = self._write_queue.get_nowait()
+            except queue.Empty:
+                break
+            pending[prop.device_id] = prop
+        
+        if not pending:
+            return True
+        try:
+            self.save_props_bulk(list(pending.values()))
+        except Exception as e:  # keep the writer thread alive whatever fails
+            print(f"Failed to save {len(pending)} props, will retry: {e}")
+            return False
+        pending.clear()
+        return True
+    
+    def _writer_loop(self):
+        """Background writer: flush the write queue about once a second"""
+        while not self._writer_stop.wait(1.0):
+            self._drain_writes()
+        if not self._drain_writes():
+            print(f"Shutting down with {len(self._unsaved)} props unsaved")
     
     def load_props_from_db(self):
         """Load all props from database"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_conn()
         cursor = conn.cursor()
         
         cursor.execute('SELECT * FROM props ORDER BY device_label')
@@ -154,9 +365,9 @@ class PropConfigManager:
                 firmware_version=row[9] or "",
                 online=False
             )
-            self.props[prop.device_id] = prop
+            self._store_prop(prop)
         
-        conn.close()
+        self._summary_dirty = True
         print(f"Loaded {len(self.props)} props from database")
     
     def update_prop_config(self, device_id: str, config_update: dict) -> bool:
@@ -168,17 +379,22 @@ class PropConfigManager:
         
         # Update prop remotely
         try:
-            response = requests.post(
+            # Pre-serialized body over the shared keep-alive session
+            response = self.session.post(
                 f"http://{prop.ip_address}/api/config",
-                json=config_update,
-                timeout=5
+                data=json_dumps(config_update),
+                headers={"Content-Type": "application/json"},
+                timeout=2
             )
             
             if response.status_code == 200:
-                # Update local copy
-                for key, value in config_update.items():
-                    if hasattr(prop, key):
-                        setattr(prop, key, value)
+                # Update local copy, re-indexing in case label or universe changed
+                with self._index_lock:
+                    self._unindex(prop)
+                    for key, value in config_update.items():
+                        if hasattr(prop, key):
+                            setattr(prop, key, value)
+                    self._index(prop)
                 
                 # Save to database
                 self.save_prop_to_db(prop)
@@ -192,31 +408,31 @@ class PropConfigManager:
     
     def get_prop_by_label(self, label: str) -> Optional[PropDevice]:
         """Find prop by device label"""
-        for prop in self.props.values():
-            if prop.device_label == label:
-                return prop
-        return None
+        return self._by_label.get(label)
     
     def get_props_by_universe(self, universe: int) -> List[PropDevice]:
         """Get all props in a specific SACN universe"""
-        return [prop for prop in self.props.values() if prop.sacn_universe == universe]
+        return list(self._by_universe.get(universe, ()))
     
     def check_address_conflicts(self) -> List[Tuple[PropDevice, PropDevice]]:
         """Check for DMX address conflicts within universes"""
         conflicts = []
         
-        for universe in set(prop.sacn_universe for prop in self.props.values()):
-            universe_props = self.get_props_by_universe(universe)
+        with self._index_lock:
+            groups = [list(universe_props) for universe_props in self._by_universe.values()]
+        
+        for universe_props in groups:
+            # Sweep in start-address order, keeping the ranges still open at
+            # the current start; each of those overlaps the current prop
+            universe_props.sort(key=lambda p: p.dmx_start_address)
+            active: List[Tuple[int, PropDevice]] = []
             
-            for i, prop1 in enumerate(universe_props):
-                for prop2 in universe_props[i+1:]:
-                    # Calculate address ranges
-                    prop1_end = prop1.dmx_start_address + (prop1.num_leds * 3) - 1
-                    prop2_end = prop2.dmx_start_address + (prop2.num_leds * 3) - 1
-                    
-                    # Check for overlap
-                    if not (prop1_end < prop2.dmx_start_address or prop2_end < prop1.dmx_start_address):
-                        conflicts.append((prop1, prop2))
+            for prop2 in universe_props:
+                start = prop2.dmx_start_address
+                active = [(end, prop1) for end, prop1 in active if end >= start]
+                for _, prop1 in active:
+                    conflicts.append((prop1, prop2))
+                active.append((start + (prop2.num_leds * 3) - 1, prop2))
         
         return conflicts
     
@@ -242,28 +458,73 @@ class PropConfigManager:
         else:
             return 1  # Suggest new universe needed
     
+    def mark_alive(self, device_id: str, when: float) -> bool:
+        """Record a heartbeat reply in memory only; False if the prop is unknown"""
+        prop = self.props.get(device_id)
+        if prop is None:
+            return False
+        prop.last_seen = when
+        prop.online = True
+        self._summary_dirty = True
+        return True
+    
+    def mark_offline_before(self, cutoff: float):
+        """Flag props that have not been heard from since cutoff as offline"""
+        for prop in list(self.props.values()):
+            if prop.online and prop.last_seen < cutoff:
+                prop.online = False
+                self._summary_dirty = True
+    
     def get_status_summary(self) -> dict:
-        """Get summary of all props and their status"""
+        """Get summary of all props and their status (cached; treat as read-only)"""
+        if not self._summary_dirty and self._summary_cache is not None:
+            return self._summary_cache
+        
+        # Clear the flag first so a change made while rebuilding marks it dirty again
+        self._summary_dirty = False
         online_count = sum(1 for prop in self.props.values() if prop.online)
         conflicts = self.check_address_conflicts()
         
-        return {
+        self._summary_cache = {
             "total_props": len(self.props),
             "online_props": online_count,
             "offline_props": len(self.props) - online_count,
             "address_conflicts": len(conflicts),
-            "universes_in_use": len(set(prop.sacn_universe for prop in self.props.values())),
-            "props": [asdict(prop) for prop in self.props.values()]
+            "universes_in_use": len(self._by_universe),
+            "props": [prop.to_status_dict() for prop in self.props.values()]
         }
+        return self._summary_cache
 
 class EnhancedSACNController:
     """Enhanced SACN controller with prop configuration management"""
     
-    def __init__(self):
+    # mDNS services the prop firmware advertises
+    MDNS_SERVICE_TYPES = ["_tricorder._tcp.local.", "_http._tcp.local."]
+    
+    # Liveness comes from a cheap UDP heartbeat; the HTTP config fetch only
+    # runs on a much slower cycle
+    HEARTBEAT_PORT = 8888
+    HEARTBEAT_INTERVAL = 2.0
+    HEARTBEAT_WINDOW = 0.1
+    OFFLINE_AFTER = 30.0
+    CONFIG_REFRESH_INTERVAL = 300.0
+    
+    def __init__(self, subnet_sweep: bool = True):
         self.prop_manager = PropConfigManager()
         self.running = False
         self.sacn_socket = None
         self.discovery_thread = None
+        # Probe the whole scan network once at startup to catch props without mDNS
+        self.subnet_sweep = subnet_sweep
+        self.scan_network = ipaddress.IPv4Network(
+            os.environ.get("TRICORDER_SUBNET", "192.168.1.0/24"), strict=False
+        )
+        self._scan_hosts = [str(host) for host in self.scan_network.hosts()]
+        self._stop_event = threading.Event()
+        # Every prop firmware answers "discovery" with its deviceId and IP
+        self._heartbeat_payload = json_dumps(
+            {"commandId": "heartbeat", "action": "discovery", "parameters": {}}
+        )
         
     def start(self):
         """Start the enhanced SACN controller"""
@@ -274,6 +535,7 @@ class EnhancedSACNController:
         
         # Start discovery
         self.running = True
+        self._stop_event.clear()
         self.discovery_thread = threading.Thread(target=self._discovery_loop)
         self.discovery_thread.daemon = True
         self.discovery_thread.start()
@@ -283,30 +545,121 @@ class EnhancedSACNController:
     def stop(self):
         """Stop the controller"""
         self.running = False
+        self._stop_event.set()
         if self.discovery_thread:
             self.discovery_thread.join()
+        self.prop_manager.shutdown()
     
     def _discovery_loop(self):
         """Continuous discovery of props on network"""
-        while self.running:
-            # Simple network scan (you could use mDNS for better discovery)
-            for i in range(1, 255):
+        if Zeroconf is None:
+            # No mDNS available; the slow refresh cycle rescans the subnet
+            print("zeroconf not installed, falling back to subnet scanning")
+        
+        if self.subnet_sweep or Zeroconf is None:
+            self._sweep_subnet()
+        
+        # Props announce themselves over multicast, so after startup we only
+        # react to mDNS add/update events instead of probing every address
+        zc = Zeroconf() if Zeroconf is not None else None
+        if zc is not None:
+            ServiceBrowser(zc, self.MDNS_SERVICE_TYPES, handlers=[self._on_service])
+        
+        heartbeat_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        heartbeat_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        heartbeat_socket.setblocking(False)
+        next_refresh = time.monotonic() + self.CONFIG_REFRESH_INTERVAL
+        try:
+            while not self._stop_event.wait(self.HEARTBEAT_INTERVAL):
+                self._heartbeat_cycle(heartbeat_socket)
+                
+                if time.monotonic() >= next_refresh:
+                    if zc is None:
+                        self._sweep_subnet()
+                    else:
+                        self._probe_hosts([p.ip_address for p in list(self.prop_manager.props.values()) if p.online])
+                    next_refresh = time.monotonic() + self.CONFIG_REFRESH_INTERVAL
+        finally:
+            heartbeat_socket.close()
+            if zc is not None:
+                zc.close()
+    
+    def _heartbeat_cycle(self, sock: socket.socket):
+        """Broadcast one discovery ping and mark every prop that answers as online"""
+        try:
+            sock.sendto(self._heartbeat_payload, (str(self.scan_network.broadcast_address), self.HEARTBEAT_PORT))
+        except OSError as e:
+            print(f"Heartbeat send failed: {e}")
+            return
+        
+        now = time.time()
+        deadline = time.monotonic() + self.HEARTBEAT_WINDOW
+        unknown: List[str] = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([sock], [], [], remaining)[0]:
+                break
+            try:
+                data, addr = sock.recvfrom(4096)
+                reply = json_loads(data)  # orjson's decode error is a ValueError too
+                device_id = reply["deviceId"]
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            if not self.prop_manager.mark_alive(device_id, now):
+                unknown.append(addr[0])
+        
+        self.prop_manager.mark_offline_before(now - self.OFFLINE_AFTER)
+        # A reply from a prop we have never fetched is a cheap discovery
+        if unknown:
+            self._probe_hosts(unknown)
+    
+    def _sweep_subnet(self):
+        """Probe every host in scan_network (TRICORDER_SUBNET) for a prop"""
+        self._probe_hosts(self._scan_hosts)
+    
+    def _probe_hosts(self, ips: List[str]):
+        """Fetch config from each address and save new or changed props"""
+        # Probes are network-bound, so they run 32 at a time.
+        pool = ThreadPoolExecutor(max_workers=32)
+        futures = [pool.submit(self.prop_manager.fetch_prop, ip) for ip in ips]
+        try:
+            for future in futures:
                 if not self.running:
                     break
                 
-                ip = f"192.168.1.{i}"  # Adjust network range as needed
-                prop = self.prop_manager.discover_prop(ip)
-                
-                if prop:
-                    # Check for conflicts after discovery
-                    conflicts = self.prop_manager.check_address_conflicts()
-                    if conflicts:
-                        print(f"WARNING: DMX address conflicts detected:")
-                        for prop1, prop2 in conflicts:
-                            print(f"  {prop1.device_label} vs {prop2.device_label} in universe {prop1.sacn_universe}")
-            
-            # Wait before next discovery cycle
-            time.sleep(30)
+                prop = future.result()
+                # Props whose config is unchanged need neither a write nor a conflict check
+                if prop and self.prop_manager.refresh_prop(prop):
+                    self.prop_manager.save_prop_to_db(prop)
+                    self._report_conflicts()
+        finally:
+            # Drop probes that have not started yet if we stopped early
+            for future in futures:
+                future.cancel()
+            pool.shutdown()
+    
+    def _on_service(self, zeroconf, service_type: str, name: str, state_change) -> None:
+        """ServiceBrowser callback: fetch config from props that (re)announce"""
+        if state_change not in (ServiceStateChange.Added, ServiceStateChange.Updated):
+            return
+        
+        info = zeroconf.get_service_info(service_type, name, timeout=2000)
+        if info is None:
+            return
+        
+        for ip in info.parsed_addresses(IPVersion.V4Only):
+            prop = self.prop_manager.fetch_prop(ip)
+            if prop and self.prop_manager.refresh_prop(prop):
+                self.prop_manager.save_prop_to_db(prop)
+                self._report_conflicts()
+    
+    def _report_conflicts(self):
+        """Check for conflicts after discovery"""
+        conflicts = self.prop_manager.check_address_conflicts()
+        if conflicts:
+            print(f"WARNING: DMX address conflicts detected:")
+            for prop1, prop2 in conflicts:
+                print(f"  {prop1.device_label} vs {prop2.device_label} in universe {prop1.sacn_universe}")
     
     def configure_prop(self, device_id: str, **config) -> bool:
         """Configure a specific prop"""
@@ -5,16 +5,25 @@ Prop control server with sACN monitoring capabilities
 """
 
 import asyncio
+import ctypes
+import ctypes.util
+import errno
+import os
 import socket
+import struct
+import sys
 import json
 import time
 import uuid
 import threading
 import ipaddress
 import requests
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, List, Optional
-from flask import Flask, render_template, request, jsonify, send_file, abort
+from flask import Flask, Response, render_template, request, jsonify, send_file, abort
+from flask.json.provider import DefaultJSONProvider
 from flask_socketio import SocketIO, emit
 
 # Optional import for network interface detection
@@ -23,29 +32,298 @@ try:
 except ImportError:
     psutil = None
 
+# Optional faster event loop for the UDP listener
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Optional faster JSON for the UDP path; both sides work on bytes
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    orjson = None
+    
+    def _loads(data):
+        # stdlib json takes bytes but not the memoryviews the listener hands over
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+    
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+# recvmmsg(2)/sendmmsg(2) move a whole burst of datagrams in one syscall. They
+# are Linux-only, so callers fall back to recvfrom()/sendto() elsewhere.
+class _iovec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+class _msghdr(ctypes.Structure):
+    _fields_ = [('msg_name', ctypes.c_void_p), ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.POINTER(_iovec)), ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p), ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+class _mmsghdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', _msghdr), ('msg_len', ctypes.c_uint)]
+
+def _load_mmsg(name, argtypes):
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fn = getattr(libc, name)
+    except (OSError, AttributeError):
+        return None
+    fn.argtypes = argtypes
+    fn.restype = ctypes.c_int
+    return fn
+
+_recvmmsg = _load_mmsg('recvmmsg', [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p])
+_sendmmsg = _load_mmsg('sendmmsg', [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int])
+
+# Largest device datagram we accept; firmware replies serialize JSON documents
+# of up to 2 KB, so a full 1500-byte MTU buffer is not enough
+RX_BUFFER_SIZE = 8192
+
+class RecvBatch:
+    """Preallocated recvmmsg() buffers for up to `count` datagrams of `size` bytes"""
+    
+    def __init__(self, count: int = 64, size: int = RX_BUFFER_SIZE):
+        self.count = count
+        self.bufs = [bytearray(size) for _ in range(count)]
+        self.views = [memoryview(buf) for buf in self.bufs]
+        self.names = [ctypes.create_string_buffer(16) for _ in range(count)]  # sockaddr_in
+        self.iovs = (_iovec * count)()
+        self.msgs = (_mmsghdr * count)()
+        for i in range(count):
+            self.iovs[i].iov_base = ctypes.addressof((ctypes.c_char * size).from_buffer(self.bufs[i]))
+            self.iovs[i].iov_len = size
+            hdr = self.msgs[i].msg_hdr
+            hdr.msg_iov = ctypes.pointer(self.iovs[i])
+            hdr.msg_iovlen = 1
+            hdr.msg_name = ctypes.cast(self.names[i], ctypes.c_void_p)
+    
+    def drain(self, sock: socket.socket):
+        """Yield (data, addr) for every datagram queued on sock, `count` per syscall
+        
+        data is a memoryview into a reused buffer and is only valid until the
+        generator is resumed.
+        """
+        fd = sock.fileno()
+        while True:
+            for msg in self.msgs:
+                msg.msg_hdr.msg_namelen = 16
+            n = _recvmmsg(fd, ctypes.addressof(self.msgs), self.count, socket.MSG_DONTWAIT, None)
+            if n < 0:
+                err = ctypes.get_errno()
+                if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return
+                raise OSError(err, os.strerror(err))
+            for i in range(n):
+                raw = self.names[i].raw
+                addr = (socket.inet_ntoa(raw[4:8]), struct.unpack_from('!H', raw, 2)[0])
+                if self.msgs[i].msg_hdr.msg_flags & socket.MSG_TRUNC:
+                    print(f"⚠️ Dropped oversized datagram from {addr}")
+                    continue
+                yield self.views[i][:self.msgs[i].msg_len], addr
+            if n < self.count:
+                return
+
+def send_datagrams(sock: socket.socket, payload: bytes, addrs: List[tuple]) -> int:
+    """Send payload to every (ip, port) in addrs, returning how many went out
+    
+    Destinations the kernel rejects are skipped, as with individual sendto().
+    """
+    if _sendmmsg is None:
+        sent = 0
+        for addr in addrs:
+            try:
+                sock.sendto(payload, addr)
+                sent += 1
+            except OSError:
+                continue
+        return sent
+    
+    count = len(addrs)
+    buf = ctypes.create_string_buffer(payload, len(payload))
+    iov = _iovec(ctypes.addressof(buf), len(payload))
+    family = struct.pack('=H', socket.AF_INET)
+    names = ctypes.create_string_buffer(b''.join(
+        family + struct.pack('!H', port) + socket.inet_aton(ip) + bytes(8)  # sockaddr_in
+        for ip, port in addrs))
+    msgs = (_mmsghdr * count)()
+    for i, msg in enumerate(msgs):
+        hdr = msg.msg_hdr
+        hdr.msg_name = ctypes.addressof(names) + 16 * i
+        hdr.msg_namelen = 16
+        hdr.msg_iov = ctypes.pointer(iov)
+        hdr.msg_iovlen = 1
+    
+    fd = sock.fileno()
+    i = sent = 0
+    while i < count:
+        n = _sendmmsg(fd, ctypes.addressof(msgs[i]), count - i, 0)
+        if n >= 0:
+            i += n
+            sent += n
+            continue
+        err = ctypes.get_errno()
+        if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+            time.sleep(0.001)  # send buffer full; let it drain
+        elif err != errno.EINTR:
+            i += 1  # the failed datagram is always the first one
+    return sent
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, so jsonify() and request.get_json() use it"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        # Types orjson can't encode natively go through Flask's usual fallback
+        return orjson.dumps(obj, default=self.default).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Flask app setup
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = 'tricorder_control_secret'
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Threading mode on purpose: the UDP listener's event loop and recvmmsg calls
+# need real OS threads, which eventlet/gevent monkey patching would turn into
+# greenlets. In production this runs under gunicorn's threaded worker (see
+# wsgi.py); simple-websocket gives this mode native WebSockets instead of
+# HTTP long-polling.
+socketio = SocketIO(app, async_mode='threading', cors_allowed_origins="*")
 
 # Configuration
 CONFIG = {
     "udp_port": 8888,
+    "udp_rcvbuf": 4 * 1024 * 1024,  # bytes; the kernel may cap this (net.core.rmem_max)
+    "udp_reuse_port": False,  # share udp_port with other processes (SO_REUSEADDR/SO_REUSEPORT)
     "web_port": 8080,  # Changed to match web frontend proxy configuration
     "device_timeout": 30,  # seconds
     "command_timeout": 5,  # seconds
     "sacn_enabled": False,  # Disable sACN integration for basic use
     "sacn_universe": 1,  # Default sACN universe
     "sacn_fps": 30,  # sACN update rate
+    "update_batch_interval": 0.1,  # seconds to collect device packets before a batched emit
 }
 
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
+class DeviceState:
+    """Registry entry for a device, refreshed in place by each status packet"""
+    device_id: str
+    device_type: str
+    ip_address: str
+    port: int
+    last_seen: float  # time.time(); formatted for clients by to_dict()
+    device_label: str = ''
+    fixture_number: int = 1
+    status: str = 'online'
+    firmware_version: Optional[str] = None
+    wifi_connected: Optional[bool] = None
+    free_heap: Optional[int] = None
+    uptime: Optional[int] = None
+    sacn_configured: bool = False
+    # Device-type-specific fields, then the remaining raw payload keys, which
+    # the dashboards read directly (batteryVoltage, temperature, ...)
+    details: Dict = field(default_factory=dict)
+    extra: Dict = field(default_factory=dict)
+
+    def update(self, data: Dict, addr):
+        """Apply a status packet from `addr`"""
+        self.ip_address, self.port = addr[0], addr[1]
+        self.last_seen = time.time()
+        self.status = 'online'
+        self.device_label = data.get('deviceLabel', self.device_id)  # Use deviceLabel if available, fallback to device_id
+        self.fixture_number = data.get('fixtureNumber', 1)  # Default to fixture 1 if not specified
+        # Common ESP32 fields
+        self.firmware_version = data.get('firmwareVersion')
+        self.wifi_connected = data.get('wifiConnected')
+        self.free_heap = data.get('freeHeap')
+        self.uptime = data.get('uptime')
+        self.extra = data
+        
+        # Add device-specific fields
+        if self.device_type == 'tricorder':
+            self.details = {
+                'sd_card_initialized': data.get('sdCardInitialized'),
+                'video_playing': data.get('videoPlaying'),
+                'current_video': data.get('currentVideo'),
+                'video_looping': data.get('videoLooping'),
+                'current_frame': data.get('currentFrame'),
+                'battery_voltage': data.get('batteryVoltage'),
+                'battery_percentage': data.get('batteryPercentage'),
+                'battery_status': data.get('batteryStatus'),
+            }
+        elif self.device_type == 'polyinoculator':
+            self.details = {
+                'num_leds': data.get('numLeds', 12),
+                'brightness': data.get('brightness', 128),
+                'sacn_enabled': data.get('sacnEnabled', True),
+                'sacn_universe': data.get('sacnUniverse', 1),
+            }
+
+    def to_dict(self) -> Dict:
+        """Flat JSON-ready view sent to web clients"""
+        # Raw payload keys go first so the typed fields below always win
+        return {
+            **self.extra,
+            'device_id': self.device_id,
+            'device_type': self.device_type,
+            'device_label': self.device_label,
+            'fixture_number': self.fixture_number,
+            'ip_address': self.ip_address,
+            'port': self.port,
+            'last_seen': datetime.fromtimestamp(self.last_seen).isoformat(),
+            'status': self.status,
+            'firmware_version': self.firmware_version,
+            'wifi_connected': self.wifi_connected,
+            'free_heap': self.free_heap,
+            'uptime': self.uptime,
+            **self.details,
+            'sacn_configured': self.sacn_configured,
+        }
+
 # Global state
-devices: Dict[str, Dict] = {}
+devices: Dict[str, DeviceState] = {}
 active_commands: Dict[str, Dict] = {}
-command_history: List[Dict] = []
+command_history: deque = deque(maxlen=1024)
 server_ip: Optional[str] = None
 server_start_time = time.time()
 
+# Serialized /api/devices body, rebuilt only after `devices` changes
+_devices_lock = threading.Lock()
+_devices_snapshot = b'[]'
+_snapshot_dirty = True
+
+def device_views() -> List[Dict]:
+    """Client view of every registered device"""
+    return [device.to_dict() for device in list(devices.values())]
+
+def mark_devices_changed():
+    """Invalidate the /api/devices snapshot; call after mutating `devices`"""
+    global _snapshot_dirty
+    _snapshot_dirty = True
+
+# Device updates waiting for the next batched emit, keyed by device id, and
+# the raw packets behind them in arrival order
+_pending_updates: Dict[str, DeviceState] = {}
+_pending_responses: List[Dict] = []
+_pending_lock = threading.Lock()
+_pending_ready = threading.Event()
+
+def queue_device_update(device_id: str, response: Dict):
+    """Schedule a device and its raw packet for the next batched broadcast"""
+    with _pending_lock:
+        _pending_updates[device_id] = devices[device_id]
+        _pending_responses.append({'device_id': device_id, 'response': response})
+    _pending_ready.set()
+
 def get_server_ip():
     """Get the server's IP address"""
     global server_ip
@@ -59,11 +337,11 @@ def get_server_ip():
             server_ip = "127.0.0.1"
     return server_ip or "127.0.0.1"
 
-def auto_configure_tricorder_for_sacn(device_id: str, device_info: dict):
+def auto_configure_tricorder_for_sacn(device_id: str, device_info: DeviceState):
     """Placeholder for sACN configuration - disabled"""
     print(f"📡 sACN auto-configuration disabled for {device_id}")
 
-def auto_configure_polyinoculator_for_sacn(device_id: str, device_info: dict):
+def auto_configure_polyinoculator_for_sacn(device_id: str, device_info: DeviceState):
     """Placeholder for sACN configuration - disabled"""  
     print(f"📡 sACN auto-configuration disabled for {device_id}")
 
@@ -71,34 +349,80 @@ class TricorderServer:
     def __init__(self):
         self.udp_socket = None
         self.running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Buffers for batched receives, allocated once
+        self._rx_batch = RecvBatch(64, RX_BUFFER_SIZE) if _recvmmsg else None
+        self._rx_buf = bytearray(RX_BUFFER_SIZE)
+        self._rx_view = memoryview(self._rx_buf)
         
     def start_udp_listener(self):
         """Start UDP listener for device communication"""
         try:
             self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # A larger kernel queue absorbs heartbeat bursts from a big fleet
+            self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, CONFIG["udp_rcvbuf"])
+            if CONFIG["udp_reuse_port"]:
+                # Opt-in only: the kernel would split device traffic across every
+                # process bound to the port, each with its own device registry,
+                # so by default a second server fails to bind instead
+                self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                if hasattr(socket, 'SO_REUSEPORT'):
+                    self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
             self.udp_socket.bind(('', CONFIG["udp_port"]))
+            # Only bounds sendto() from web threads; receives never wait on it
             self.udp_socket.settimeout(1.0)
             self.running = True
             
+            # The event loop blocks in epoll/kqueue until datagrams are queued,
+            # and stop_udp_listener() wakes it through the loop's self-pipe
+            self._loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+            self._loop.add_reader(self.udp_socket.fileno(), self._on_readable)
+            
             print(f"UDP listener started on port {CONFIG['udp_port']}")
             
-            while self.running:
-                try:
-                    data, addr = self.udp_socket.recvfrom(4096)  # Increased buffer size like original
-                    self.handle_device_message(data.decode('utf-8'), addr)
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    print(f"❌ UDP error: {e}")
+            try:
+                self._loop.run_forever()
+            finally:
+                self._loop.remove_reader(self.udp_socket.fileno())
+                self._loop.close()
+                udp_socket, self.udp_socket = self.udp_socket, None
+                udp_socket.close()
                     
         except Exception as e:
             print(f"Failed to start UDP listener: {e}")
     
-    def handle_device_message(self, message: str, addr: tuple):
-        """Handle incoming device messages"""
+    def stop_udp_listener(self):
+        """Stop the UDP listener's event loop from any thread"""
+        self.running = False
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+    
+    def _on_readable(self):
+        """Event-loop reader callback: handle whatever the socket has queued"""
+        try:
+            if self._rx_batch is not None:
+                # Pull everything queued in batches
+                for data, addr in self._rx_batch.drain(self.udp_socket):
+                    self.handle_device_message(data, addr)
+            else:
+                # Receive into the reused buffer instead of a new bytes per packet;
+                # the reader fires again while more datagrams are waiting
+                n, addr = self.udp_socket.recvfrom_into(self._rx_buf)
+                self.handle_device_message(self._rx_view[:n], addr)
+        except (BlockingIOError, socket.timeout):
+            pass
+        except Exception as e:
+            print(f"❌ UDP error: {e}")
+    
+    def handle_device_message(self, message, addr: tuple):
+        """Handle incoming device messages
+        
+        message is bytes or a memoryview into the listener's receive buffer;
+        it must not be kept after this returns.
+        """
         try:
-            data = json.loads(message)
-            print(f"📡 Received from {addr}: {message}")
+            data = _loads(message)
+            print(f"📡 Received from {addr}: {str(message, 'utf-8', 'replace')}")
             
             # Skip messages from the server itself
             if addr[0] == get_server_ip():
@@ -121,112 +445,65 @@ class TricorderServer:
             device_type = 'tricorder' if is_tricorder else 'polyinoculator'
             
             # Update device registry with comprehensive info
-            devices[device_id] = {
-                'device_id': device_id,
-                'device_type': device_type,
-                'device_label': data.get('deviceLabel', device_id),  # Use deviceLabel if available, fallback to device_id
-                'fixture_number': data.get('fixtureNumber', 1),  # Default to fixture 1 if not specified
-                'ip_address': addr[0],
-                'port': addr[1],
-                'last_seen': datetime.now().isoformat(),
-                'status': 'online',
-                # Common ESP32 fields
-                'firmware_version': data.get('firmwareVersion'),
-                'wifi_connected': data.get('wifiConnected'),
-                'free_heap': data.get('freeHeap'),
-                'uptime': data.get('uptime'),
-                **data  # Include any additional fields
-            }
-            
-            # Add device-specific fields
-            if device_type == 'tricorder':
-                devices[device_id].update({
-                    'sd_card_initialized': data.get('sdCardInitialized'),
-                    'video_playing': data.get('videoPlaying'),
-                    'current_video': data.get('currentVideo'),
-                    'video_looping': data.get('videoLooping'),
-                    'current_frame': data.get('currentFrame'),
-                    'battery_voltage': data.get('batteryVoltage'),
-                    'battery_percentage': data.get('batteryPercentage'),
-                    'battery_status': data.get('batteryStatus'),
-                })
-            elif device_type == 'polyinoculator':
-                devices[device_id].update({
-                    'num_leds': data.get('numLeds', 12),
-                    'brightness': data.get('brightness', 128),
-                    'sacn_enabled': data.get('sacnEnabled', True),
-                    'sacn_universe': data.get('sacnUniverse', 1),
-                })
+            device = devices.get(device_id)
+            if device is None or device.device_type != device_type:
+                device = DeviceState(device_id, device_type, addr[0], addr[1], time.time())
+                devices[device_id] = device
+            device.update(data, addr)
             
             print(f"✓ Updated device: {device_id} ({device_type}) at {addr[0]}")
             
             # Auto-configure device for sACN control (only if not already configured)
-            if device_id not in devices or 'sacn_configured' not in devices[device_id]:
+            if not device.sacn_configured:
                 print(f"🔧 Configuring {device_id} for sACN...")
                 if device_type == 'tricorder':
-                    auto_configure_tricorder_for_sacn(device_id, devices[device_id])
+                    auto_configure_tricorder_for_sacn(device_id, device)
                 elif device_type == 'polyinoculator':
-                    auto_configure_polyinoculator_for_sacn(device_id, devices[device_id])
-                devices[device_id]['sacn_configured'] = True
+                    auto_configure_polyinoculator_for_sacn(device_id, device)
+                device.sacn_configured = True
                 print(f"✅ {device_id} sACN configuration complete")
             else:
                 print(f"📝 {device_id} already configured for sACN")
             
-            # Broadcast to web clients
-            socketio.emit('device_update', devices[device_id])
-            print(f"📡 Emitted device_update for {device_id}")
+            mark_devices_changed()
             
-            # Also broadcast the raw response for command handling
-            socketio.emit('device_response', {
-                'device_id': device_id,
-                'response': data
-            })
-            print(f"📡 Emitted device_response for {device_id}: {data.get('result', 'No result')}")
+            # Broadcast the new state and raw response to web clients on the
+            # next batch tick
+            queue_device_update(device_id, data)
+            print(f"📡 Queued device_response for {device_id}: {data.get('result', 'No result')}")
             
-        except json.JSONDecodeError:
-            print(f"⚠️ Invalid JSON from {addr}: {message}")
+        except json.JSONDecodeError:  # orjson's decode error subclasses this
+            print(f"⚠️ Invalid JSON from {addr}: {str(message, 'utf-8', 'replace')}")
         except Exception as e:
             print(f"❌ Error handling message from {addr}: {e}")
 
 # Initialize server
 server = TricorderServer()
 
+def expire_active_commands(now: float):
+    """Drop tracked commands older than the command timeout"""
+    cutoff = now - CONFIG['command_timeout']
+    # Records are inserted in send order, so the stale ones are at the front
+    while active_commands:
+        oldest = next(iter(active_commands))
+        if active_commands[oldest]['sent_at'] >= cutoff:
+            break
+        del active_commands[oldest]
+
 def cleanup_offline_devices():
     """Remove devices that haven't been seen within the timeout period"""
     global devices
-    current_time = datetime.now()
-    timeout_seconds = CONFIG['device_timeout']
-    
-    offline_devices = []
+    cutoff = time.time() - CONFIG['device_timeout']
     
-    for device_id, device_info in list(devices.items()):
-        try:
-            last_seen_str = device_info.get('last_seen')
-            if not last_seen_str:
-                continue
-                
-            last_seen = datetime.fromisoformat(last_seen_str.replace('Z', '+00:00'))
-            # Handle timezone-naive datetime by assuming local timezone
-            if last_seen.tzinfo is None:
-                last_seen = last_seen.replace(tzinfo=None)
-                current_time_local = current_time.replace(tzinfo=None)
-            else:
-                current_time_local = current_time
-            
-            time_diff = (current_time_local - last_seen).total_seconds()
-            
-            if time_diff > timeout_seconds:
-                offline_devices.append(device_id)
-                
-        except (ValueError, TypeError) as e:
-            print(f"⚠️ Error parsing last_seen for {device_id}: {e}")
-            # If we can't parse the timestamp, consider it old and remove it
-            offline_devices.append(device_id)
+    offline_devices = [
+        device_id for device_id, device_info in list(devices.items())
+        if device_info.last_seen < cutoff
+    ]
     
     # Remove offline devices
     for device_id in offline_devices:
-        device_info = devices.pop(device_id, {})
-        print(f"🔌 Removed offline device: {device_id} (last seen: {device_info.get('last_seen', 'unknown')})")
+        last_seen = datetime.fromtimestamp(devices.pop(device_id).last_seen).isoformat()
+        print(f"🔌 Removed offline device: {device_id} (last seen: {last_seen})")
         
         # Remove from sACN receiver if configured
         if SACN_AVAILABLE:
@@ -238,13 +515,14 @@ def cleanup_offline_devices():
         socketio.emit('device_removed', {
             'device_id': device_id,
             'reason': 'timeout',
-            'last_seen': device_info.get('last_seen')
+            'last_seen': last_seen
         })
     
     if offline_devices:
+        mark_devices_changed()
         print(f"🧹 Cleanup completed: removed {len(offline_devices)} offline devices")
         # Emit updated device list
-        socketio.emit('devices_update', list(devices.values()))
+        socketio.emit('devices_update', device_views())
 
 def device_cleanup_task():
     """Background task to periodically clean up offline devices"""
@@ -256,14 +534,36 @@ def device_cleanup_task():
             print(f"❌ Error in device cleanup task: {e}")
             time.sleep(10)  # Wait 10 seconds before retrying
 
-@app.route('/')
-def index():
-    """Main web interface - serve enhanced dashboard"""
+def device_update_emitter():
+    """Background task that broadcasts coalesced device updates"""
+    global _pending_updates, _pending_responses
+    while True:
+        # Sleep until a packet arrives, then let a batch window fill up
+        _pending_ready.wait()
+        socketio.sleep(CONFIG['update_batch_interval'])
+        with _pending_lock:
+            _pending_ready.clear()
+            batch, _pending_updates = _pending_updates, {}
+            responses, _pending_responses = _pending_responses, []
+        try:
+            socketio.emit('device_updates', [device.to_dict() for device in batch.values()])
+            socketio.emit('device_responses', responses)
+        except Exception as e:
+            print(f"❌ Error emitting device updates: {e}")
+
+# Resolved from this file rather than the working directory: the page is read
+# once, so a miss at import would pin the fallback for the life of the process
+DASHBOARD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              '..', 'web', 'enhanced-prop-dashboard.html')
+
+def _build_index_html():
+    """Load the enhanced dashboard, falling back to the basic interface"""
     try:
-        with open('web/enhanced-prop-dashboard.html', 'r', encoding='utf-8') as f:
+        with open(DASHBOARD_PATH, 'r', encoding='utf-8') as f:
             return f.read()
     except FileNotFoundError:
         # Fallback to basic interface if enhanced dashboard not found
+        print(f"⚠️ Dashboard not found at {DASHBOARD_PATH}; serving basic interface")
         return basic_interface()
 
 def basic_interface():
@@ -288,10 +588,28 @@ def basic_interface():
     </html>
     '''
 
+# Pages are static for the life of the process, so encode them once
+_INDEX_HTML = _build_index_html().encode('utf-8')
+_HTML_CACHE_CONTROL = 'public, max-age=3600'
+
+@app.route('/')
+def index():
+    """Main web interface - serve enhanced dashboard"""
+    response = Response(_INDEX_HTML, mimetype='text/html')
+    response.headers['Cache-Control'] = _HTML_CACHE_CONTROL
+    return response
+
 @app.route('/api/devices')
 def get_devices():
     """Get all connected devices"""
-    return jsonify(list(devices.values()))
+    global _devices_snapshot, _snapshot_dirty
+    if _snapshot_dirty:
+        with _devices_lock:
+            if _snapshot_dirty:
+                # Clear first so a change made while serializing re-dirties it
+                _snapshot_dirty = False
+                _devices_snapshot = _dumps(device_views())
+    return Response(_devices_snapshot, mimetype='application/json')
 
 @app.route('/api/devices/cleanup', methods=['POST'])
 def manual_device_cleanup():
@@ -322,6 +640,29 @@ def get_server_info():
         'status': 'running'
     })
 
+# Scan common IP ranges for ESP32 devices, from .2 to .254 (skip .1 as it's
+# usually the router, and .255 is broadcast)
+DISCOVERY_RANGES = (
+    "192.168.1.{}", # Common home router range
+    "192.168.0.{}", # Alternative home router range
+    "10.0.0.{}",    # Some router configurations
+)
+DISCOVERY_TARGETS = tuple(template.format(i) for template in DISCOVERY_RANGES for i in range(2, 255))
+DISCOVERY_BATCH = 50  # datagrams per sendmmsg() call between pauses
+
+def run_discovery_scan(payload: bytes, targets: List[tuple]):
+    """Send the discovery command to every target in paced batches"""
+    sent = 0
+    for start in range(0, len(targets), DISCOVERY_BATCH):
+        if start:
+            socketio.sleep(0.1)  # Small delay to prevent network flooding
+        try:
+            sent += send_datagrams(server.udp_socket, payload, targets[start:start + DISCOVERY_BATCH])
+        except Exception as e:
+            print(f"❌ Discovery send error: {e}")
+            return
+    print(f"📤 Sent discovery to {sent} IP addresses across multiple ranges")
+
 @app.route('/api/discovery', methods=['POST'])
 def start_discovery():
     """Manually trigger device discovery"""
@@ -335,42 +676,14 @@ def start_discovery():
             'timestamp': datetime.now().isoformat()
         }
         
-        # Scan common IP ranges for ESP32 devices
-        ip_ranges = [
-            "192.168.1.{}", # Common home router range
-            "192.168.0.{}", # Alternative home router range
-            "10.0.0.{}",    # Some router configurations
-        ]
-        
-        devices_found = 0
-        
         if server.udp_socket:
-            command_json = json.dumps(discovery_command)
+            command_json = _dumps(discovery_command)
+            targets = [(ip, CONFIG['udp_port']) for ip in DISCOVERY_TARGETS]
             
-            # For each IP range, scan common device IPs
-            for ip_template in ip_ranges:
-                # Scan from .2 to .254 (skip .1 as it's usually the router, and .255 is broadcast)
-                for i in range(2, 255):
-                    target_ip = ip_template.format(i)
-                    try:
-                        # Send discovery command
-                        server.udp_socket.sendto(
-                            command_json.encode('utf-8'),
-                            (target_ip, CONFIG['udp_port'])
-                        )
-                        devices_found += 1
-                        
-                        # Add small delay to prevent network flooding
-                        if devices_found % 50 == 0:
-                            import time
-                            time.sleep(0.1)
-                            
-                    except Exception as e:
-                        # Skip IPs that can't be reached
-                        continue
+            # Pace the sends off the request thread so the response is immediate
+            socketio.start_background_task(run_discovery_scan, command_json, targets)
             
-            print(f"📤 Sent discovery to {devices_found} IP addresses across multiple ranges")
-            return jsonify({'status': f'Discovery scan initiated - scanned {devices_found} IP addresses'})
+            return jsonify({'status': f'Discovery scan initiated - scanning {len(targets)} IP addresses'})
         else:
             return jsonify({'error': 'UDP socket not available'}), 500
             
@@ -398,9 +711,9 @@ def add_device():
         }
         
         if server.udp_socket:
-            command_json = json.dumps(ping_command)
+            command_json = _dumps(ping_command)
             server.udp_socket.sendto(
-                command_json.encode('utf-8'),
+                command_json,
                 (ip_address, CONFIG['udp_port'])
             )
             print(f"📤 Sent ping to {ip_address}")
@@ -447,11 +760,11 @@ def send_udp_command_to_device(device_id: str, action: str, parameters: dict, co
         
     try:
         # Send UDP command
-        command_json = json.dumps(esp32_command)
+        command_json = _dumps(esp32_command)
         if server.udp_socket:
             server.udp_socket.sendto(
-                command_json.encode('utf-8'),
-                (device['ip_address'], CONFIG['udp_port'])
+                command_json,
+                (device.ip_address, CONFIG['udp_port'])
             )
         print(f"Sent UDP command to {device_id}: {action}")
         return True
@@ -504,8 +817,10 @@ def send_command():
             'action': action,
             'data': command_data,
             'parameters': parameters,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now().isoformat(),
+            'sent_at': time.time()
         }
+        expire_active_commands(command_record['sent_at'])
         active_commands[command_record['id']] = command_record
         command_history.append(command_record)
         
@@ -514,14 +829,14 @@ def send_command():
             device = devices[device_id]
             try:
                 # Send UDP command in ESP32 format
-                command_json = json.dumps(esp32_command)
+                command_json = _dumps(esp32_command)
                 if server.udp_socket:
                     server.udp_socket.sendto(
-                        command_json.encode('utf-8'),
-                        (device['ip_address'], CONFIG['udp_port'])
+                        command_json,
+                        (device.ip_address, CONFIG['udp_port'])
                     )
                 print(f"Sent command to {device_id}: {action}")
-                print(f"Command JSON: {command_json}")
+                print(f"Command JSON: {command_json.decode('utf-8')}")
                 
             except Exception as e:
                 print(f"Failed to send command to {device_id}: {e}")
@@ -551,23 +866,23 @@ def get_device_battery(device_id):
         }
         
         # Send UDP command
-        command_json = json.dumps(esp32_command)
+        command_json = _dumps(esp32_command)
         if server.udp_socket:
             server.udp_socket.sendto(
-                command_json.encode('utf-8'),
-                (device['ip_address'], CONFIG['udp_port'])
+                command_json,
+                (device.ip_address, CONFIG['udp_port'])
             )
         
         # Wait for response (simplified - in production you'd want better response handling)
         time.sleep(0.1)
         
         # Return battery info from device status if available
-        if 'batteryPercentage' in device:
+        if 'batteryPercentage' in device.extra:
             return jsonify({
                 'device_id': device_id,
-                'battery_voltage': device.get('batteryVoltage', 0),
-                'battery_percentage': device.get('batteryPercentage', 0),
-                'battery_status': device.get('batteryStatus', 'Unknown'),
+                'battery_voltage': device.extra.get('batteryVoltage', 0),
+                'battery_percentage': device.extra.get('batteryPercentage', 0),
+                'battery_status': device.extra.get('batteryStatus', 'Unknown'),
                 'timestamp': datetime.now().isoformat()
             })
         else:
@@ -593,7 +908,7 @@ def get_device_config(device_id):
             return jsonify({'error': f'Device {device_id} not found'}), 404
         
         device = devices[device_id]
-        ip_address = device['ip_address']
+        ip_address = device.ip_address
         
         # Send HTTP request to device's /api/config endpoint
         response = requests.get(f"http://{ip_address}/api/config", timeout=5)
@@ -623,7 +938,7 @@ def set_device_config(device_id):
             return jsonify({'error': f'Device {device_id} not found'}), 404
         
         device = devices[device_id]
-        ip_address = device['ip_address']
+        ip_address = device.ip_address
         
         # Get configuration data from request
         config_data = request.get_json()
@@ -680,7 +995,7 @@ def factory_reset_device(device_id):
             return jsonify({'error': f'Device {device_id} not found'}), 404
         
         device = devices[device_id]
-        ip_address = device['ip_address']
+        ip_address = device.ip_address
         
         # Send HTTP POST request to device's /api/factory-reset endpoint
         response = requests.post(f"http://{ip_address}/api/factory-reset", timeout=10)
@@ -725,7 +1040,7 @@ def restart_device(device_id):
             return jsonify({'error': f'Device {device_id} not found'}), 404
         
         device = devices[device_id]
-        ip_address = device['ip_address']
+        ip_address = device.ip_address
         
         # Send HTTP POST request to device's /api/restart endpoint
         response = requests.post(f"http://{ip_address}/api/restart", timeout=5)
@@ -1058,7 +1373,7 @@ def disable_sacn():
 def handle_connect():
     """Handle client connection"""
     print('Client connected')
-    emit('devices', list(devices.values()))
+    emit('devices', device_views())
 
 @socketio.on('disconnect')
 def handle_disconnect():
@@ -1104,11 +1419,12 @@ def run_udp_server():
     """Run UDP server in background thread"""
     server.start_udp_listener()
 
-if __name__ == '__main__':
-    print("Starting Prop Control Server with sACN Data Viewer...")
-    print(f"Web interface: http://localhost:{CONFIG['web_port']}")
-    print(f"UDP listener: port {CONFIG['udp_port']}")
+def start_background_services() -> threading.Thread:
+    """Start the sACN receiver, UDP listener and background tasks
     
+    Called once per process: by __main__ for the development server, or by
+    wsgi.py when served by gunicorn. Returns the UDP listener thread.
+    """
     # Initialize sACN receiver if enabled
     if CONFIG['sacn_enabled'] and SACN_AVAILABLE:
         sacn_receiver = initialize_sacn_receiver("0.0.0.0")  # Listen on all interfaces
@@ -1139,5 +1455,22 @@ if __name__ == '__main__':
     cleanup_thread.start()
     print(f"Device cleanup task started (timeout: {CONFIG['device_timeout']}s)")
     
-    # Run Flask app
-    socketio.run(app, host='0.0.0.0', port=CONFIG['web_port'], debug=False)
+    # Coalesce per-packet device updates into one emit per tick
+    socketio.start_background_task(device_update_emitter)
+    
+    return udp_thread
+
+if __name__ == '__main__':
+    print("Starting Prop Control Server with sACN Data Viewer...")
+    print(f"Web interface: http://localhost:{CONFIG['web_port']}")
+    print(f"UDP listener: port {CONFIG['udp_port']}")
+    
+    udp_thread = start_background_services()
+    
+    # Run Flask app on the Werkzeug development server (also the Windows
+    # launch path); for production use gunicorn via wsgi.py
+    try:
+        socketio.run(app, host='0.0.0.0', port=CONFIG['web_port'], debug=False)
+    finally:
+        server.stop_udp_listener()
+        udp_thread.join(timeout=2)
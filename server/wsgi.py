@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Production entry point for the Prop Control Server
+
+Serve with gunicorn's threaded worker. Keep a single worker: the device
+registry, the UDP socket and Socket.IO state all live in one process.
+
+    gunicorn --chdir server -w 1 --threads 32 -b 0.0.0.0:8080 wsgi:app
+"""
+
+import atexit
+
+from enhanced_server import app, server, start_background_services
+
+start_background_services()
+atexit.register(server.stop_udp_listener)
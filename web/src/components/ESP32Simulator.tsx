@@ -37,6 +37,31 @@ interface VideoFrame {
   category: 'static' | 'animated' | 'color';
 }
 
+// Raw frames are 320x240 little-endian RGB565, the ST7789's native format
+const RAW_FRAME_WIDTH = 320;
+const RAW_FRAME_HEIGHT = 240;
+
+const rawFrameUrl = (frameSrc: string) =>
+  frameSrc.replace('/api/simulator/frames/', '/api/simulator/frames_raw/');
+
+const rgb565ToImageData = (buffer: ArrayBuffer): ImageData => {
+  const pixels = new DataView(buffer);
+  const image = new ImageData(RAW_FRAME_WIDTH, RAW_FRAME_HEIGHT);
+  const out = image.data;
+  for (let i = 0, j = 0; i < RAW_FRAME_WIDTH * RAW_FRAME_HEIGHT; i++, j += 4) {
+    const v = pixels.getUint16(i * 2, true);
+    const r = v >> 11;
+    const g = (v >> 5) & 0x3f;
+    const b = v & 0x1f;
+    // Replicate the high bits into the low ones so full scale maps to 255
+    out[j] = (r << 3) | (r >> 2);
+    out[j + 1] = (g << 2) | (g >> 4);
+    out[j + 2] = (b << 3) | (b >> 2);
+    out[j + 3] = 255;
+  }
+  return image;
+};
+
 // Mock video frames based on your firmware structure
 const mockVideoFrames: VideoFrame[] = [
   { src: '/api/simulator/frames/startup.jpg', name: 'startup.jpg', category: 'static' },
@@ -60,6 +85,7 @@ export const ESP32Simulator: React.FC<ESP32SimulatorProps> = ({
   onCommand
 }) => {
   const canvasRef = useRef<HTMLCanvasElement>(null);
+  const frameCanvasRef = useRef<HTMLCanvasElement | null>(null);
   const [currentFrame, setCurrentFrame] = useState<VideoFrame | null>(null);
   const [isPlaying, setIsPlaying] = useState(false);
   const [brightness, setBrightness] = useState(80);
@@ -117,23 +143,7 @@ export const ESP32Simulator: React.FC<ESP32SimulatorProps> = ({
     const ctx = canvas.getContext('2d');
     if (!ctx) return;
 
-    const img = new Image();
-    img.onload = () => {
-      // Apply brightness filter
-      ctx.filter = `brightness(${brightness}%)`;
-      
-      // Clear canvas
-      ctx.fillStyle = '#000000';
-      ctx.fillRect(0, 0, width, height);
-      
-      // Draw image scaled to fit screen
-      ctx.drawImage(img, 0, 0, width, height);
-      
-      // Reset filter
-      ctx.filter = 'none';
-    };
-    
-    img.onerror = () => {
+    const drawMissingFrame = () => {
       // Fallback to colored rectangle for missing images
       const colorMatch = frameSrc.match(/color_(\w+)/);
       if (colorMatch) {
@@ -159,8 +169,42 @@ export const ESP32Simulator: React.FC<ESP32SimulatorProps> = ({
         ctx.fillText(frameSrc.split('/').pop() || '', width / 2, height / 2 + 20);
       }
     };
-    
-    img.src = frameSrc;
+
+    fetch(rawFrameUrl(frameSrc))
+      .then(response => {
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.arrayBuffer();
+      })
+      .then(buffer => {
+        if (buffer.byteLength !== RAW_FRAME_WIDTH * RAW_FRAME_HEIGHT * 2) {
+          throw new Error('Unexpected frame size');
+        }
+
+        // putImageData ignores filters and scaling, so stage the frame on
+        // an offscreen canvas and draw that
+        if (!frameCanvasRef.current) {
+          frameCanvasRef.current = document.createElement('canvas');
+          frameCanvasRef.current.width = RAW_FRAME_WIDTH;
+          frameCanvasRef.current.height = RAW_FRAME_HEIGHT;
+        }
+        const frameCtx = frameCanvasRef.current.getContext('2d');
+        if (!frameCtx) return;
+        frameCtx.putImageData(rgb565ToImageData(buffer), 0, 0);
+
+        // Apply brightness filter
+        ctx.filter = `brightness(${brightness}%)`;
+        
+        // Clear canvas
+        ctx.fillStyle = '#000000';
+        ctx.fillRect(0, 0, width, height);
+        
+        // Draw frame scaled to fit screen
+        ctx.drawImage(frameCanvasRef.current, 0, 0, width, height);
+        
+        // Reset filter
+        ctx.filter = 'none';
+      })
+      .catch(drawMissingFrame);
   };
 
   // Animation loop
@@ -117,6 +117,15 @@ class WebSocketService {
       this.emit('device_update', data);
     });
 
+    // The server coalesces updates and sends them as one batch per tick
+    this.socket.on('device_updates', (batch: any[]) => {
+      batch.forEach((data) => this.emit('device_update', data));
+    });
+
+    this.socket.on('device_responses', (batch: any[]) => {
+      batch.forEach((data) => this.emit('device_response', data));
+    });
+
     this.socket.on('command_response', (data) => {
       console.log('📨 Command response received:', data);
       this.emit('command_response', data);